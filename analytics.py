@@ -0,0 +1,160 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import data_catalog
+import data_store
+import deduction_analysis
+import grading
+import ranking_service
+import suggestion_engine
+import trend_engine
+
+# 不属于考核项目的列（必需列和合并多个月份时的月份列）
+NON_ITEM_COLUMNS = data_store.REQUIRED_COLUMNS + ['月份']
+
+# 改进建议表缓存的最大条目数（进程内共享，超过时淘汰最久未使用的结果）
+MAX_SHEET_CACHE_ENTRIES = 16
+
+# 改进建议表缓存：(数据库内容指纹, 月份, 规则配置修改时间) -> 改进建议表
+_sheets = OrderedDict()
+_sheets_lock = threading.Lock()
+
+# 已有的纯计算函数（页面、后台任务和基准测试统一从这里调用）
+rank = ranking_service.rank_frame
+grade_bands = grading.grade_bands
+deductions = deduction_analysis.top_deductions
+class_month_matrix = trend_engine.class_month_matrix
+
+# 考核项目列
+def item_columns(columns):
+    """从列名中排除编号、班级、初始分数、实际班级总分和月份列，返回考核项目列（保持原有顺序）"""
+    return [col for col in columns if col not in NON_ITEM_COLUMNS]
+
+# 查找总分列
+def total_score_column(columns):
+    """返回第一个名称包含“总分”的列（例如实际班级总分），没有时返回None"""
+    for col in columns:
+        if '实际班级总分' in col or '总分' in col:
+            return col
+    return None
+
+# 读取一个月份的数据
+def load_month(month, columns=None, data_dir=data_store.DEFAULT_DATA_DIR):
+    """同步并读取月份对应的数据文件（同时有.xlsx和.csv文件时以.xlsx为准），返回宽表；指定columns时只读取这些列
+
+    月份没有数据文件或文件无法导入时抛出ValueError。
+    """
+    entry = data_catalog.month_sources(data_dir).get(month)
+    if entry is None:
+        raise ValueError(f"没有找到{month}的数据文件")
+    return data_store.read_month(entry['path'], data_dir=data_dir, columns=columns)
+
+# 总分统计
+def score_summary(scores):
+    """返回总分的最高分、最低分、平均分和标准差（缺失值不参与计算）"""
+    scores = pd.to_numeric(pd.Series(scores), errors='coerce')
+    return {
+        '最高分': scores.max(),
+        '最低分': scores.min(),
+        '平均分': scores.mean(),
+        '标准差': scores.std()
+    }
+
+# 在数据库中的所有月份中排名
+def rank_months(k=ranking_service.DEFAULT_K, column=ranking_service.DEFAULT_COLUMN, largest=True, month=None, grade=None,
+                full_rows=False, data_dir=data_store.DEFAULT_DATA_DIR):
+    """在数据库中导入的班级记录中排名（可限定月份和年级），返回包含班级、月份和排名列的前（后）k条记录
+
+    full_rows为True时只读取排名结果所在月份的完整数据，按班级和月份取回对应行的全部列。
+    """
+    ranked = ranking_service.rank_store(k, column, largest, month, grade, data_dir=data_dir)
+    if not full_rows or ranked.empty:
+        return ranked
+    full = data_store.load_months(list(dict.fromkeys(ranked['月份'].astype(str))), data_dir=data_dir)
+    full = full.assign(班级=full['班级'].astype(str), 月份=full['月份'].astype(str))
+    keys = ranked[['班级', '月份']].astype(str)
+    return keys.merge(full.drop_duplicates(['班级', '月份']), on=['班级', '月份'], how='left')
+
+# 一个月份各考核项目的加减分统计
+def item_stats(month, items, data_dir=data_store.DEFAULT_DATA_DIR):
+    """从预先聚合的结果中读取各考核项目的加减分总量、加分次数、扣分次数和总次数（非零次数），
+    返回按items顺序排列的DataFrame；没有数值的项目按0统计"""
+    stats = data_store.month_item_stats(months=[month], items=items, data_dir=data_dir).set_index('考核项目')
+    stats = stats[['总和', '加分次数', '扣分次数', '非零次数']].reindex(items).fillna(0)
+    return pd.DataFrame({
+        '考核项目': items,
+        '加减分总量': stats['总和'].to_numpy(),
+        '加分次数': stats['加分次数'].astype(int).to_numpy(),
+        '扣分次数': stats['扣分次数'].astype(int).to_numpy(),
+        '总次数': stats['非零次数'].astype(int).to_numpy()
+    })
+
+# 考核项目统计要点
+def item_highlights(stats):
+    """根据item_stats的结果找出高频扣分项（按扣分次数从多到少）、扣分总量最多和加分总量最多的项目
+
+    返回字典：deduction_items为有扣分的项目，most_frequent为扣分次数最多的项目（没有扣分时为None），
+    most_deducted为扣分总量最多的项目（加减分总量都不为负时为None），most_added为加分总量最多的项目（没有加分时为None）。
+    """
+    deduction_items = stats[stats['扣分次数'] > 0].sort_values('扣分次数', ascending=False)
+    if stats.empty:
+        return {'deduction_items': deduction_items, 'most_frequent': None, 'most_deducted': None, 'most_added': None}
+    totals = stats['加减分总量'].to_numpy(dtype='float64')
+    lowest = stats.iloc[int(np.argmin(totals))]
+    highest = stats.iloc[int(np.argmax(totals))]
+    return {
+        'deduction_items': deduction_items,
+        'most_frequent': deduction_items.iloc[0] if not deduction_items.empty else None,
+        'most_deducted': lowest if lowest['加减分总量'] < 0 else None,
+        'most_added': highest if highest['加减分总量'] > 0 else None
+    }
+
+# 全校改进建议表
+def improvement_sheet(months, data_dir=data_store.DEFAULT_DATA_DIR):
+    """返回所给月份每个班级一行的改进建议表（见suggestion_engine.improvement_sheet）
+
+    结果按数据库内容指纹、月份和规则配置的修改时间缓存，数据和规则都没有变化时不再读取数据和重新生成。
+    """
+    months = list(months)
+    key = (data_store.dataset_fingerprint(data_dir), tuple(months), os.stat(suggestion_engine.RULES_PATH).st_mtime_ns)
+    with _sheets_lock:
+        if key in _sheets:
+            _sheets.move_to_end(key)
+            return _sheets[key].copy()
+    sheet = suggestion_engine.improvement_sheet(data_store.load_months(months, data_dir=data_dir))
+    with _sheets_lock:
+        _sheets[key] = sheet
+        _sheets.move_to_end(key)
+        while len(_sheets) > MAX_SHEET_CACHE_ENTRIES:
+            _sheets.popitem(last=False)
+    return sheet.copy()
+
+# 考核项目各月份统计
+def item_trend(item, months, data_dir=data_store.DEFAULT_DATA_DIR):
+    """从预先聚合的结果中读取考核项目在各月份（按月份顺序）的平均分、总分和班级数，没有数据的月份总分和班级数为0"""
+    months = sorted(months, key=data_catalog.month_key)
+    stats = data_store.month_item_stats(months=months, items=[item], data_dir=data_dir).set_index('月份').reindex(months)
+    return pd.DataFrame({
+        '月份': months,
+        '平均分': stats['平均值'].to_numpy(),
+        '总分': stats['总和'].fillna(0).to_numpy(),
+        '班级数': stats['次数'].fillna(0).astype(int).to_numpy()
+    })
+
+# 所有班级的趋势斜率
+def trend_slopes(matrix, column='实际班级总分', months=None, data_dir=data_store.DEFAULT_DATA_DIR):
+    """返回每个班级的趋势斜率、首末月份总分变化、有效月份数和最近月份（缺失月份不参与计算）
+
+    months为matrix中未经修改（例如未填充）的数据库月份；正好是数据库中的全部月份时直接使用导入时增量维护的统计量，
+    否则对matrix一次性计算。
+    """
+    if months is not None and set(months) == set(data_store.list_months(data_dir)):
+        return data_store.trend_summary(column, data_dir=data_dir)
+    return trend_engine.trend_stats(matrix)
+
+# 总分呈下降趋势的班级
+def risk_classes(trends):
+    """返回趋势斜率为负（总分呈下降趋势）的班级，按总分下降幅度从大到小排列"""
+    return trends[trends['趋势斜率'] < 0].reset_index().sort_values('总分变化', ascending=True)
@@ -1,7 +1,10 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-import os
+import analytics
+import data_catalog
+import data_store
+import html_table
+import suggestion_engine
 from rankings import generate_improvement_suggestions
 
 # 考核项目分析功能
@@ -9,28 +12,19 @@ def assessment_item_analysis():
     """实现考核项目分析功能"""
     st.markdown('<h2 class="section-header">📋 考核项目分析</h2>', unsafe_allow_html=True)
     
-    # 获取data目录下的Excel文件
-    excel_files = [f for f in os.listdir('data') if f.endswith('.xlsx')]
-    
-    if not excel_files:
+    # 获取data目录下的Excel文件（文件目录已按月份排序）
+    if not data_catalog.list_files(extensions=('.xlsx',)):
         st.warning("当前目录下没有找到Excel文件，请先导入数据")
         return
     
-    # 提取月份信息并排序
-    month_order = ['1月', '2月', '3月', '4月', '5月', '6月', '7月', '8月', '9月', '10月', '11月', '12月']
-    months = []
-    for file in excel_files:
-        month = file.replace('.xlsx', '')
-        if month in month_order:
-            months.append(month)
+    # 提取月份信息
+    month_entries = {entry['month']: entry for entry in data_catalog.month_files()}
+    months = list(month_entries)
     
     if not months:
         st.warning("未从Excel文件名中提取到有效的月份信息，请确保文件名格式为'X月.xlsx'")
         return
     
-    # 按月份顺序排序
-    months = sorted(months, key=lambda x: month_order.index(x))
-    
     # 自动选择最近的月份
     latest_month = months[-1]
     
@@ -42,22 +36,25 @@ def assessment_item_analysis():
     )
     
     # 根据选择的月份加载对应的Excel文件
-    selected_file = f"data/{selected_month}.xlsx"
+    selected_file = month_entries[selected_month]['path']
     try:
-        df = pd.read_excel(selected_file)
+        # 同步到数据库（文件未变化时跳过），之后只需查询列信息和预先聚合的统计量
+        result = data_store.sync_files([selected_file])[0]
+        if result['status'] == 'error':
+            raise ValueError(result['message'])
+        columns = data_store.month_columns(result['month'])
         st.success(f"成功加载 {selected_month} 的数据")
     except Exception as e:
         st.error(f"加载 {selected_month} 数据时出错: {str(e)}")
         return
     
     # 检查必要的列是否存在
-    required_columns = ['编号', '班级', '初始分数', '实际班级总分']
-    if not all(col in df.columns for col in required_columns):
+    if not all(col in columns for col in data_store.REQUIRED_COLUMNS):
         st.error("数据格式不符合要求，请检查数据文件")
         return
     
     # 获取所有考核项目列（排除非考核项目列）
-    scoring_columns = [col for col in df.columns if col not in required_columns]
+    scoring_columns = analytics.item_columns(columns)
     
     if not scoring_columns:
         st.error("未找到考核项目列，请检查数据文件")
@@ -66,45 +63,12 @@ def assessment_item_analysis():
     # 统计每个考核项目的加减分总量
     st.markdown('<div class="subsection-header-with-icon">📊 考核项目加减分总量统计</div>', unsafe_allow_html=True)
     
-    # 创建统计数据
-    scoring_stats = []
-    for col in scoring_columns:
-        # 将考核项目列转换为数值类型，忽略无法转换的值
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-        total_score = df[col].sum()
-        scoring_stats.append({
-            '考核项目': col,
-            '加减分总量': total_score,
-            '加分次数': (df[col] > 0).sum(),
-            '扣分次数': (df[col] < 0).sum(),
-            '总次数': ((df[col].notna()) & (df[col] != 0)).sum()
-        })
-    
-    scoring_df = pd.DataFrame(scoring_stats)
-    
-    # 显示统计表格
-    display_df = scoring_df.copy()
-    display_df.index = range(1, len(display_df) + 1)
-    display_df.index.name = "序号"
-    
-    # 使用HTML生成居中对齐的表格
-    html_table = f"""
-    <table style="width: 100%; border-collapse: collapse; text-align: center;">
-        <thead>
-            <tr style="background-color: #f0f2f6;">
-                <th style="padding: 8px; border: 1px solid #ddd;">序号</th>
-                {''.join([f'<th style="padding: 8px; border: 1px solid #ddd;">{col}</th>' for col in display_df.columns])}
-            </tr>
-        </thead>
-        <tbody>
-            {''.join([
-                '<tr>' + f'<td style="padding: 8px; border: 1px solid #ddd;">{index}</td>' + ''.join([f'<td style="padding: 8px; border: 1px solid #ddd;">{val}</td>' for val in row]) + '</tr>'
-                for index, row in display_df.iterrows()
-            ])}
-        </tbody>
-    </table>
-    """
-    st.markdown(html_table, unsafe_allow_html=True)
+    # 从预先聚合的结果中读取每个考核项目的统计量（切换月份只需查询，不再逐列扫描数据；没有数值的项目按0统计）
+    scoring_df = analytics.item_stats(result['month'], scoring_columns)
+    highlights = analytics.item_highlights(scoring_df)
+    
+    # 显示统计表格（使用HTML生成居中对齐的表格）
+    html_table.render_html_table(scoring_df)
     
     # 可视化加减分总量
     st.markdown('<div class="subsection-header-with-icon">📈 考核项目加减分总量对比</div>', unsafe_allow_html=True)
@@ -137,36 +101,12 @@ def assessment_item_analysis():
     # 分析高频扣分项
     st.markdown('<div class="subsection-header-with-icon">🔍 高频扣分项分析</div>', unsafe_allow_html=True)
     
-    # 筛选出有扣分的项目
-    deduction_items = scoring_df[scoring_df['扣分次数'] > 0].copy()
+    # 有扣分的项目（按扣分次数从多到少排列）
+    deduction_items = highlights['deduction_items']
     
     if not deduction_items.empty:
-        # 按扣分次数排序
-        deduction_items = deduction_items.sort_values('扣分次数', ascending=False)
-        
-        # 显示扣分项统计
-        display_deduction = deduction_items[['考核项目', '扣分次数', '加减分总量', '总次数']].copy()
-        display_deduction.index = range(1, len(display_deduction) + 1)
-        display_deduction.index.name = "序号"
-        
-        # 使用HTML生成居中对齐的表格
-        html_table = f"""
-        <table style="width: 100%; border-collapse: collapse; text-align: center;">
-            <thead>
-                <tr style="background-color: #f0f2f6;">
-                    <th style="padding: 8px; border: 1px solid #ddd;">序号</th>
-                    {''.join([f'<th style="padding: 8px; border: 1px solid #ddd;">{col}</th>' for col in display_deduction.columns])}
-                </tr>
-            </thead>
-            <tbody>
-                {''.join([
-                    '<tr>' + f'<td style="padding: 8px; border: 1px solid #ddd;">{index}</td>' + ''.join([f'<td style="padding: 8px; border: 1px solid #ddd;">{val}</td>' for val in row]) + '</tr>'
-                    for index, row in display_deduction.iterrows()
-                ])}
-            </tbody>
-        </table>
-        """
-        st.markdown(html_table, unsafe_allow_html=True)
+        # 显示扣分项统计（使用HTML生成居中对齐的表格）
+        html_table.render_html_table(deduction_items[['考核项目', '扣分次数', '加减分总量', '总次数']])
         
         # 可视化高频扣分项
         st.markdown('<div class="subsection-header-with-icon">📋 高频扣分项排名</div>', unsafe_allow_html=True)
@@ -199,25 +139,25 @@ def assessment_item_analysis():
         # 分析总结
         st.markdown('<div class="subsection-header-with-icon">📝 分析总结</div>', unsafe_allow_html=True)
         
-        # 找出扣分最多的项目
-        top_deduction = deduction_items.iloc[0]
+        # 扣分次数最多的项目
+        top_deduction = highlights['most_frequent']
         st.markdown(f"**扣分频率最高的项目：** {top_deduction['考核项目']}（共扣分 {top_deduction['扣分次数']} 次）")
         
-        # 找出扣分总量最多的项目
-        top_total_deduction = scoring_df.sort_values('加减分总量').iloc[0]
-        if top_total_deduction['加减分总量'] < 0:
+        # 扣分总量最多的项目
+        top_total_deduction = highlights['most_deducted']
+        if top_total_deduction is not None:
             st.markdown(f"**扣分总量最多的项目：** {top_total_deduction['考核项目']}（共扣 {top_total_deduction['加减分总量']:.2f} 分）")
         
-        # 找出加分最多的项目
-        top_total_addition = scoring_df.sort_values('加减分总量', ascending=False).iloc[0]
-        if top_total_addition['加减分总量'] > 0:
+        # 加分总量最多的项目
+        top_total_addition = highlights['most_added']
+        if top_total_addition is not None:
             st.markdown(f"**加分总量最多的项目：** {top_total_addition['考核项目']}（共加 {top_total_addition['加减分总量']:.2f} 分）")
         
         # 提供改进建议
         st.markdown('<div class="subsection-header-with-icon">💡 改进建议</div>', unsafe_allow_html=True)
         
         # 针对扣分最多的项目提供建议
-        if top_deduction['考核项目'] in ['手机管理', '发型发饰', '校服衣着', '两操', '违规违纪', '男生寝室卫生', '女生寝室卫生', '教室卫生', '教室规范', '班主任考勤']:
+        if top_deduction['考核项目'] in suggestion_engine.supported_items():
             suggestions = generate_improvement_suggestions([top_deduction['考核项目']])
             for suggestion in suggestions:
                 st.write(f"- {suggestion}")
@@ -228,4 +168,21 @@ def assessment_item_analysis():
         st.write("- 对考核成绩较差的班级，建议进行个别辅导和帮助")
         
     else:
-        st.info("没有发现扣分项，所有考核项目均为加分或无记录")
\ No newline at end of file
+        st.info("没有发现扣分项，所有考核项目均为加分或无记录")
+    
+    # 批量导出全校各班级的改进建议（每个班级每个月份一行，包含主要扣分项和按规则生成的建议）
+    st.markdown('<div class="subsection-header-with-icon">📥 导出全校改进建议</div>', unsafe_allow_html=True)
+    export_scope = st.radio("导出范围", [selected_month, "全部月份"], horizontal=True)
+    # 点击生成后才读取数据并生成改进建议表（结果按数据库内容缓存），浏览页面时不做这部分计算
+    if st.button("生成改进建议表", key="build_improvement_sheet"):
+        st.session_state.improvement_export = export_scope
+    if st.session_state.improvement_export == export_scope:
+        export_months = data_store.source_months() if export_scope == "全部月份" else [result['month']]
+        sheet = analytics.improvement_sheet(export_months)
+        st.caption(f"共 {len(sheet)} 个班级记录")
+        st.download_button(
+            "📥 导出改进建议（CSV）",
+            suggestion_engine.sheet_csv(sheet),
+            file_name=f"班级改进建议_{export_scope}.csv",
+            mime="text/csv"
+        )
@@ -1,15 +1,26 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-import os
+import analytics
+import data_catalog
+import data_store
+import grading
+import html_table
+
+# 等级标注对应的表格行背景颜色
+GRADE_COLORS = {
+    '优秀': '#d4edda',  # 绿色
+    '良好': '#d1ecf1',  # 蓝色
+    '合格': '#fff3cd',  # 黄色
+    '待提高': '#f8d7da'  # 红色
+}
 
 # 班级总分分析功能
 def class_score_analysis():
     """实现班级总分分析功能"""
     st.markdown('<h2 class="section-header">📊 班级总分分析</h2>', unsafe_allow_html=True)
     
-    # 获取data目录下的Excel文件
-    excel_files = [f for f in os.listdir('data') if f.endswith('.xlsx')]
+    # 获取data目录下文件名为有效月份的Excel文件
+    excel_files = [entry['name'] for entry in data_catalog.month_files()]
     
     if not excel_files:
         st.warning("当前目录下没有找到Excel文件，请先导入数据")
@@ -17,22 +28,38 @@ def class_score_analysis():
     
     # 选择月份
     selected_file = st.selectbox("选择月份", excel_files)
-    selected_month = selected_file.replace('.xlsx', '')
+    selected_entry = data_catalog.find_file(selected_file)
+    selected_month = selected_entry['month']
     
-    # 读取数据
-    df = pd.read_excel(f"data/{selected_file}")
+    # 读取数据（只需要班级和总分两列）
+    df = analytics.load_month(selected_month, columns=['班级', '实际班级总分'])
     
     # 检查是否有'班级'和'实际班级总分'列
     if '班级' not in df.columns or '实际班级总分' not in df.columns:
         st.error("数据中没有找到'班级'或'实际班级总分'列")
         return
     
-    # 数据处理
-    df = df.drop_duplicates(subset=['班级'], keep='first')  # 去重
+    # 数据在导入时已按校验规则检查（班级重复、总分不一致等），这里只提示发现的问题，不再重复清洗
+    violations = data_store.list_violations(months=[selected_month])
+    if not violations.empty:
+        st.warning(f"⚠️ {selected_month}的数据有{len(violations)}条校验问题，分析结果可能受影响")
+        with st.expander("🩺 查看数据校验问题"):
+            html_table.render_html_table(violations, numbered=False)
+    
     score_data = df[['班级', '实际班级总分']].copy()
     
-    # 计算平均分
-    average_score = score_data['实际班级总分'].mean()
+    # 等级标注规则（可调整前后名次数量和中间班级的划分方式）
+    with st.expander("⚙️ 等级标注规则"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            top_n = st.number_input("优秀（前N名）", min_value=0, value=grading.DEFAULT_TOP_N, step=1)
+        with col2:
+            bottom_n = st.number_input("待提高（后N名）", min_value=0, value=grading.DEFAULT_BOTTOM_N, step=1)
+        with col3:
+            split = st.radio("良好/合格划分", list(grading.SPLIT_OPTIONS), format_func=grading.SPLIT_OPTIONS.get, horizontal=True)
+    
+    # 按总分排名计算等级标注（与显示顺序无关，切换排序方式时无需重新计算）
+    score_data['等级标注'] = analytics.grade_bands(score_data, top_n=top_n, bottom_n=bottom_n, split=split)
     
     # 排序选项
     sort_order = st.radio("排序方式", ["从高到低", "从低到高"], horizontal=True)
@@ -42,75 +69,12 @@ def class_score_analysis():
     elif sort_order == "从低到高":
         score_data = score_data.sort_values('实际班级总分', ascending=True)
     
-    # 添加数据标注列
-    def add_annotation(row, rank, total_rows, avg_score, sort_order):
-        # 根据排序方向调整排名逻辑
-        if sort_order == "从高到低":
-            # 排名1对应最高分，排名n对应最低分
-            if rank <= 5:
-                return "优秀"
-            elif rank > total_rows - 5:
-                return "待提高"
-        else:  # 从低到高
-            # 排名1对应最低分，排名n对应最高分
-            if rank <= 5:
-                return "待提高"
-            elif rank > total_rows - 5:
-                return "优秀"
-        
-        # 中间部分根据平均分判断
-        if row['实际班级总分'] > avg_score:
-            return "良好"
-        else:
-            return "合格"
-    
-    total_rows = len(score_data)
-    score_data['等级标注'] = score_data.apply(lambda row: add_annotation(row, score_data.index.get_loc(row.name) + 1, total_rows, average_score, sort_order), axis=1)
-    
     # 显示数据表格
     st.markdown('<div class="subsection-header-with-icon">📚 班级总分数据</div>', unsafe_allow_html=True)
     
-    # 重置索引并命名为序号，从1开始
-    display_df = score_data.copy()
-    display_df.index = range(1, len(display_df) + 1)
-    display_df.index.name = "序号"
-    
-    # 使用HTML生成居中对齐的表格，为不同标注的行设置不同的背景颜色
-    html_rows = []
-    for index, row in display_df.iterrows():
-        # 根据数据标注设置背景颜色
-        annotation = row['等级标注']
-        if annotation == '优秀':
-            bg_color = '#d4edda'  # 绿色
-        elif annotation == '良好':
-            bg_color = '#d1ecf1'  # 蓝色
-        elif annotation == '合格':
-            bg_color = '#fff3cd'  # 黄色
-        else:  # 待提高
-            bg_color = '#f8d7da'  # 红色
-        
-        # 生成行HTML
-        row_html = f'<tr style="background-color: {bg_color};">'
-        row_html += f'<td style="padding: 8px; border: 1px solid #ddd;">{index}</td>'
-        for val in row:
-            row_html += f'<td style="padding: 8px; border: 1px solid #ddd;">{val}</td>'
-        row_html += '</tr>'
-        html_rows.append(row_html)
-    
-    html_table = f"""
-    <table style="width: 100%; border-collapse: collapse; text-align: center;">
-        <thead>
-            <tr style="background-color: #f0f2f6;">
-                <th style="padding: 8px; border: 1px solid #ddd;">序号</th>
-                {''.join([f'<th style="padding: 8px; border: 1px solid #ddd;">{col}</th>' for col in display_df.columns])}
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(html_rows)}
-        </tbody>
-    </table>
-    """
-    st.markdown(html_table, unsafe_allow_html=True)
+    # 使用HTML生成居中对齐的表格（班级较多时分页显示），根据数据标注为不同的行设置不同的背景颜色
+    row_styles = score_data['等级标注'].map(GRADE_COLORS).radd('background-color: ') + ';'
+    html_table.render_html_table(score_data, page_size=html_table.DEFAULT_PAGE_SIZE, key="class_score_table", row_styles=row_styles)
     
     # 创建图表
     st.markdown('<div class="subsection-header-with-icon">📈 班级总分对比</div>', unsafe_allow_html=True)
@@ -231,12 +195,13 @@ def class_score_analysis():
     
     # 统计信息
     st.markdown('<div class="subsection-header-with-icon">📊 统计信息</div>', unsafe_allow_html=True)
+    summary = analytics.score_summary(score_data['实际班级总分'])
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("最高分", score_data['实际班级总分'].max())
+        st.metric("最高分", summary['最高分'])
     with col2:
-        st.metric("最低分", score_data['实际班级总分'].min())
+        st.metric("最低分", summary['最低分'])
     with col3:
-        st.metric("平均分", score_data['实际班级总分'].mean())
+        st.metric("平均分", summary['平均分'])
     with col4:
-        st.metric("标准差", score_data['实际班级总分'].std())
\ No newline at end of file
+        st.metric("标准差", summary['标准差'])
\ No newline at end of file
@@ -0,0 +1,532 @@
+import hashlib
+import json
+import os
+import shutil
+import stat
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# 列式缓存目录名（位于数据文件所在目录下，不会出现在.xlsx/.csv文件列表中）
+CACHE_DIR_NAME = '.cache'
+
+# 上传文件清单（显示文件名 -> 内容哈希）和按内容寻址保存上传文件的目录（均位于缓存目录下）
+UPLOAD_MANIFEST_NAME = 'uploads.json'
+BLOB_DIR_NAME = 'blobs'
+
+# 缓存格式版本（转换规则变化时递增，旧版本缓存自动失效）
+CACHE_VERSION = 3
+
+# 取值重复度高、转换为分类类型的文本列
+CATEGORY_COLUMNS = ['班级', '月份', '班级教室']
+
+# 流式导入.csv文件时每块读取的行数
+CSV_CHUNK_SIZE = 100000
+
+# 后台统计元数据的任务（文件路径 -> 线程）及出错信息（文件路径 -> 错误信息）
+_metadata_jobs = {}
+_metadata_errors = {}
+_metadata_lock = threading.Lock()
+
+# 计算文件内容的SHA-256哈希值（分块读取，避免一次性读入内存）
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    """计算文件内容的SHA-256哈希值"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# 获取缓存目录
+def get_cache_dir(file_path):
+    """返回数据文件对应的缓存目录，不存在时自动创建"""
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR_NAME)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+# 获取写入文件时使用的临时文件路径（按进程和线程区分，同时写入同一文件的会话和后台任务互不影响）
+def _tmp_path(path):
+    return f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+
+# 获取文件的缓存清单路径
+def _manifest_path(file_path):
+    return os.path.join(get_cache_dir(file_path), os.path.basename(file_path) + '.json')
+
+# 获取内容哈希对应的Parquet缓存路径（按内容寻址，相同内容的文件共用一份缓存）
+def _parquet_path(file_path, sha256):
+    return os.path.join(get_cache_dir(file_path), f'{sha256}.v{CACHE_VERSION}.parquet')
+
+# 读取缓存清单
+def _load_manifest(file_path):
+    try:
+        with open(_manifest_path(file_path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# 写入缓存清单（先写临时文件再替换，避免并发读到半个文件）
+def _save_manifest(file_path, manifest):
+    manifest_path = _manifest_path(file_path)
+    tmp_path = _tmp_path(manifest_path)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+# 删除不再被任何清单引用的旧缓存（Parquet缓存和元数据一起删除）
+def _remove_orphan_cache(file_path, sha256):
+    cache_dir = get_cache_dir(file_path)
+    for name in os.listdir(cache_dir):
+        if not name.endswith('.json') or name.endswith('.meta.json'):
+            continue
+        try:
+            with open(os.path.join(cache_dir, name), 'r', encoding='utf-8') as f:
+                if json.load(f).get('sha256') == sha256:
+                    return
+        except (OSError, ValueError):
+            continue
+    for path in (_parquet_path(file_path, sha256), _metadata_path(file_path, sha256)):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+# 直接解析原始数据文件
+def parse_data_file(file_path):
+    """根据文件扩展名解析原始的.xlsx或.csv文件"""
+    if file_path.endswith('.xlsx'):
+        return pd.read_excel(file_path)
+    elif file_path.endswith('.csv'):
+        # 微信小程序导出的.csv文件从第3行开始为数据行（跳过前2行）
+        return pd.read_csv(file_path, skiprows=2)
+    raise ValueError(f"不支持的文件格式: {os.path.basename(file_path)}")
+
+# 获取文件内容哈希（修改时间和大小与缓存清单一致时直接使用清单中的哈希，无需重新读取文件）
+def get_content_hash(file_path):
+    """返回数据文件的内容哈希"""
+    stat = os.stat(file_path)
+    manifest = _load_manifest(file_path)
+    if manifest is not None and manifest['mtime_ns'] == stat.st_mtime_ns and manifest['size'] == stat.st_size:
+        return manifest['sha256']
+    return file_sha256(file_path)
+
+# 统一混有文本和数值的列，使其可以写入Parquet：除空白文本外全是数值的列转换为数值（空白视为缺失值），其余转换为文本
+def _normalize_mixed_columns(df):
+    for col in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[col], skipna=True) in ('string', 'empty'):
+            continue
+        values = df[col].map(lambda val: None if isinstance(val, str) and not val.strip() else val)
+        numeric = pd.to_numeric(values, errors='coerce')
+        if numeric.notna().sum() == values.notna().sum():
+            df[col] = numeric
+        else:
+            df[col] = df[col].map(lambda val: val if pd.isna(val) else str(val))
+    return df
+
+# 选择能无损容纳数值列的最小类型：无缺失值的整数列取最小整数类型，能被float32精确表示的列取float32
+def _compact_numeric(series):
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+    valid = series.dropna()
+    if len(valid) and len(valid) == len(series) and bool((valid % 1 == 0).all()):
+        return pd.to_numeric(series, downcast='integer')
+    compact = series.astype('float32')
+    if bool(((compact.astype('float64') == series) | series.isna()).all()):
+        return compact
+    return series
+
+# 压缩数据类型
+def normalize_dtypes(df, month_categories=None):
+    """将班级、月份、班级教室转换为分类类型，数值列无损压缩为小整数或float32
+
+    month_categories给定时，月份列转换为按该顺序排列的有序分类，可直接按月份排序。
+    压缩前的内存占用记录在df.attrs['memory_before']中，用于统计节省的内存。
+    """
+    memory_before = df.attrs.get('memory_before')
+    if memory_before is None:
+        memory_before = int(df.memory_usage(deep=True).sum())
+    df = df.copy(deep=False)
+    for col in df.columns:
+        if col == '月份' and month_categories is not None:
+            df[col] = pd.Categorical(df[col].astype(object), categories=month_categories, ordered=True)
+        elif col in CATEGORY_COLUMNS:
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = _compact_numeric(df[col])
+    df.attrs['memory_before'] = memory_before
+    return df
+
+# 统计数据集的内存占用
+def memory_report(df):
+    """返回数据集压缩前后的内存占用（字节）及节省比例"""
+    memory_after = int(df.memory_usage(deep=True).sum())
+    memory_before = df.attrs.get('memory_before', memory_after)
+    saved = memory_before - memory_after
+    return {
+        'before': memory_before,
+        'after': memory_after,
+        'saved': saved,
+        'saved_ratio': saved / memory_before if memory_before else 0.0
+    }
+
+# 生成内存占用说明文字
+def describe_memory(df):
+    """返回形如"128.0 KB（压缩前 512.0 KB，节省 75%）"的内存占用说明"""
+    report = memory_report(df)
+    return f"{report['after'] / 1024:.1f} KB（压缩前 {report['before'] / 1024:.1f} KB，节省 {report['saved_ratio']:.0%}）"
+
+# 读取Parquet缓存，并恢复压缩前的内存占用记录；指定columns时只读取其中存在的列
+def _read_parquet(parquet_path, columns=None):
+    if columns is not None:
+        names = pq.read_schema(parquet_path).names
+        return pq.read_table(parquet_path, columns=[col for col in names if col in columns]).to_pandas()
+    table = pq.read_table(parquet_path)
+    df = table.to_pandas()
+    metadata = table.schema.metadata or {}
+    if b'memory_before' in metadata:
+        df.attrs['memory_before'] = int(metadata[b'memory_before'])
+    return df
+
+# 只保留指定的列（按文件中的列顺序，忽略不存在的列）
+def _project(df, columns):
+    if columns is None:
+        return df
+    return df[[col for col in df.columns if col in columns]]
+
+# 将压缩后的数据写入Parquet缓存
+def _write_parquet(df, parquet_path):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b'memory_before'] = str(df.attrs.get('memory_before', '')).encode()
+    pq.write_table(table.replace_schema_metadata(metadata), parquet_path)
+
+# 分块读取微信小程序导出的.csv文件，并删除每块中Unnamed:开头的空列
+def _iter_csv_chunks(file_path, chunksize):
+    for chunk in pd.read_csv(file_path, skiprows=2, chunksize=chunksize):
+        yield chunk.loc[:, ~chunk.columns.str.contains('^Unnamed:')]
+
+# 第一遍扫描：逐块统计每列的取值情况，确定能容纳全部数据的最小类型，并累计直接读取时的内存占用
+def _plan_csv_dtypes(file_path, chunksize):
+    stats = {}
+    memory_before = 0
+    for chunk in _iter_csv_chunks(file_path, chunksize):
+        memory_before += int(chunk.memory_usage(deep=True, index=False).sum())
+        for col in chunk.columns:
+            col_stats = stats.setdefault(col, {'text': False, 'integral': True, 'float32': True, 'null': False, 'min': None, 'max': None})
+            values = chunk[col]
+            numeric = pd.to_numeric(values, errors='coerce')
+            present = values.notna()
+            if values.dtype == object:
+                present &= values.astype(str).str.strip() != ''
+            col_stats['text'] |= bool((numeric.isna() & present).any())
+            col_stats['null'] |= bool(numeric.isna().any())
+            valid = numeric.dropna()
+            if len(valid):
+                col_stats['integral'] &= bool((valid % 1 == 0).all())
+                col_stats['float32'] &= bool((valid.astype('float32').astype('float64') == valid).all())
+                col_stats['min'] = valid.min() if col_stats['min'] is None else min(col_stats['min'], valid.min())
+                col_stats['max'] = valid.max() if col_stats['max'] is None else max(col_stats['max'], valid.max())
+
+    dtypes = {}
+    for col, col_stats in stats.items():
+        if col in CATEGORY_COLUMNS:
+            dtypes[col] = 'category'
+        elif col_stats['text']:
+            dtypes[col] = 'string'
+        elif col_stats['min'] is not None and col_stats['integral'] and not col_stats['null']:
+            dtypes[col] = next(
+                dtype for dtype in ('int8', 'int16', 'int32', 'int64')
+                if np.iinfo(dtype).min <= col_stats['min'] and col_stats['max'] <= np.iinfo(dtype).max
+            )
+        else:
+            dtypes[col] = 'float32' if col_stats['float32'] else 'float64'
+    return dtypes, memory_before
+
+# 按预先确定的类型转换一块数据
+def _cast_chunk(chunk, dtypes):
+    chunk = chunk.copy()
+    for col, dtype in dtypes.items():
+        if dtype in ('string', 'category'):
+            chunk[col] = chunk[col].where(chunk[col].isna(), chunk[col].astype(str))
+            if dtype == 'category':
+                chunk[col] = chunk[col].astype('category')
+        else:
+            chunk[col] = pd.to_numeric(chunk[col], errors='coerce').astype(dtype)
+    return chunk
+
+# 流式转换.csv文件为Parquet
+def stream_csv_to_parquet(file_path, parquet_path, chunksize=CSV_CHUNK_SIZE):
+    """分块读取.csv文件（跳过前2行），删除Unnamed:空列并压缩数据类型后逐块写入Parquet
+
+    第一遍扫描确定每列能容纳全部数据的最小类型（整数列取最小整数类型，能精确表示时浮点列取float32，
+    班级等列为分类类型），第二遍按该类型逐块写入，任何时候内存中只保留一块数据。
+    """
+    dtypes, memory_before = _plan_csv_dtypes(file_path, chunksize)
+    arrow_types = {'string': pa.string(), 'category': pa.dictionary(pa.int32(), pa.string())}
+    schema = pa.schema(
+        [(col, arrow_types[dtype] if dtype in arrow_types else pa.from_numpy_dtype(np.dtype(dtype))) for col, dtype in dtypes.items()],
+        metadata={b'memory_before': str(memory_before).encode()}
+    )
+    with pq.ParquetWriter(parquet_path, schema) as writer:
+        for chunk in _iter_csv_chunks(file_path, chunksize):
+            writer.write_table(pa.Table.from_pandas(_cast_chunk(chunk, dtypes), schema=schema, preserve_index=False))
+
+# 通过列式缓存读取数据文件
+def read_data_file(file_path, columns=None):
+    """读取数据文件，首次读取时转换为Parquet缓存，之后直接读取缓存
+
+    缓存以文件路径、修改时间和内容哈希为键：修改时间和大小未变时直接命中缓存；
+    修改时间变化但内容哈希一致时只更新清单；内容变化时重新解析并覆盖缓存。
+    指定columns时只返回其中存在的列，命中缓存时只从Parquet中读取这些列。
+    """
+    stat = os.stat(file_path)
+    manifest = _load_manifest(file_path)
+
+    if manifest is not None:
+        parquet_path = _parquet_path(file_path, manifest['sha256'])
+        if manifest['mtime_ns'] == stat.st_mtime_ns and manifest['size'] == stat.st_size and os.path.exists(parquet_path):
+            return _read_parquet(parquet_path, columns)
+
+    sha256 = file_sha256(file_path)
+    parquet_path = _parquet_path(file_path, sha256)
+    new_manifest = {
+        'path': os.path.abspath(file_path),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': sha256
+    }
+
+    if os.path.exists(parquet_path):
+        # 内容未变（或已有相同内容的文件被缓存过），只需更新清单
+        df = _read_parquet(parquet_path, columns)
+    elif file_path.endswith('.csv'):
+        # .csv文件可能很大，分块流式转换，峰值内存与文件大小无关
+        tmp_path = _tmp_path(parquet_path)
+        try:
+            stream_csv_to_parquet(file_path, tmp_path)
+            os.replace(tmp_path, parquet_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        df = _read_parquet(parquet_path, columns)
+    else:
+        # 首次读取时解析完整文件并写入缓存（之后各页面按需从缓存中只读取所需的列）
+        df = normalize_dtypes(_normalize_mixed_columns(parse_data_file(file_path)))
+        tmp_path = _tmp_path(parquet_path)
+        try:
+            _write_parquet(df, tmp_path)
+            os.replace(tmp_path, parquet_path)
+        except Exception:
+            # 无法转换为列式格式（例如列中混有不同类型的值）时直接返回解析结果，不做缓存
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return _project(df, columns)
+        df = _project(df, columns)
+
+    _save_manifest(file_path, new_manifest)
+    if manifest is not None and manifest['sha256'] != sha256:
+        _remove_orphan_cache(file_path, manifest['sha256'])
+    return df
+
+# 快速预览数据文件的前几行
+def peek_data_file(file_path, nrows=10):
+    """只读取数据文件的前nrows行用于预览，不解析整个文件"""
+    stat = os.stat(file_path)
+    manifest = _load_manifest(file_path)
+    if manifest is not None and manifest['mtime_ns'] == stat.st_mtime_ns and manifest['size'] == stat.st_size:
+        parquet_path = _parquet_path(file_path, manifest['sha256'])
+        if os.path.exists(parquet_path):
+            batch = next(pq.ParquetFile(parquet_path).iter_batches(batch_size=nrows), None)
+            if batch is not None:
+                return batch.to_pandas()
+    if file_path.endswith('.xlsx'):
+        return pd.read_excel(file_path, nrows=nrows)
+    elif file_path.endswith('.csv'):
+        return pd.read_csv(file_path, skiprows=2, nrows=nrows)
+    raise ValueError(f"不支持的文件格式: {os.path.basename(file_path)}")
+
+# 获取内容哈希对应的元数据文件路径
+def _metadata_path(file_path, sha256):
+    return os.path.join(get_cache_dir(file_path), f'{sha256}.v{CACHE_VERSION}.meta.json')
+
+# 计算完整文件的元数据并保存到缓存目录
+def compute_metadata(file_path):
+    """解析完整文件（同时生成列式缓存），统计行数、内存占用、各列数据类型和缺失值数量
+
+    与数据导入页面一致，统计时不包含Unnamed:开头的空列。
+    """
+    df = read_data_file(file_path)
+    df = df.loc[:, ~df.columns.astype(str).str.startswith('Unnamed:')]
+    null_counts = df.isnull().sum()
+    memory = memory_report(df)
+    metadata = {
+        'rows': int(len(df)),
+        'memory_before': memory['before'],
+        'memory_after': memory['after'],
+        'columns': [
+            {'name': str(col), 'dtype': str(df[col].dtype), 'non_null': int(len(df) - null_counts[col]), 'null': int(null_counts[col])}
+            for col in df.columns
+        ]
+    }
+    sha256 = get_content_hash(file_path)
+    metadata_path = _metadata_path(file_path, sha256)
+    tmp_path = _tmp_path(metadata_path)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False)
+    os.replace(tmp_path, metadata_path)
+    return metadata
+
+# 读取已计算好的元数据
+def get_metadata(file_path):
+    """返回文件的元数据，尚未计算完成时返回None（不会触发解析或哈希计算）"""
+    stat = os.stat(file_path)
+    manifest = _load_manifest(file_path)
+    if manifest is None or manifest['mtime_ns'] != stat.st_mtime_ns or manifest['size'] != stat.st_size:
+        return None
+    try:
+        with open(_metadata_path(file_path, manifest['sha256']), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# 在后台线程中计算元数据
+def _run_metadata_job(file_path):
+    try:
+        compute_metadata(file_path)
+    except Exception as e:
+        _metadata_errors[file_path] = str(e)
+
+# 启动后台元数据统计任务
+def start_metadata_job(file_path):
+    """在后台线程中解析完整文件并计算元数据，已有任务在运行或元数据已存在时不重复启动"""
+    with _metadata_lock:
+        job = _metadata_jobs.get(file_path)
+        if job is not None and job.is_alive():
+            return
+        if get_metadata(file_path) is not None:
+            return
+        _metadata_errors.pop(file_path, None)
+        job = threading.Thread(target=_run_metadata_job, args=(file_path,), daemon=True)
+        _metadata_jobs[file_path] = job
+        job.start()
+
+# 查询后台元数据统计任务的状态
+def metadata_job_error(file_path):
+    """返回后台统计任务的出错信息，没有出错时返回None"""
+    return _metadata_errors.get(file_path)
+
+# 判断后台元数据统计任务是否仍在运行
+def metadata_job_running(file_path):
+    """返回文件的后台统计任务是否仍在运行"""
+    job = _metadata_jobs.get(file_path)
+    return job is not None and job.is_alive()
+
+# 读取上传文件清单
+def load_upload_manifest(data_dir):
+    """返回上传文件清单（显示文件名 -> 内容哈希）"""
+    try:
+        with open(os.path.join(data_dir, CACHE_DIR_NAME, UPLOAD_MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+# 写入上传文件清单
+def _save_upload_manifest(data_dir, manifest):
+    manifest_path = os.path.join(get_cache_dir(os.path.join(data_dir, UPLOAD_MANIFEST_NAME)), UPLOAD_MANIFEST_NAME)
+    tmp_path = _tmp_path(manifest_path)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+# 获取内容哈希对应的上传内容文件路径
+def _blob_path(data_dir, sha256, file_name):
+    blob_dir = os.path.join(data_dir, CACHE_DIR_NAME, BLOB_DIR_NAME)
+    os.makedirs(blob_dir, exist_ok=True)
+    return os.path.join(blob_dir, sha256 + os.path.splitext(file_name)[1])
+
+# 按内容寻址保存上传文件
+def save_upload(buffer, file_name, data_dir, chunk_size=1024 * 1024):
+    """按内容寻址保存上传文件，返回(status, sha256)
+
+    上传内容已在内存中，先分块计算内容哈希（不产生拷贝）：同名文件内容相同时不做任何操作（unchanged）；
+    内容已上传过时直接硬链接到已有内容、不再写入（linked），列式缓存也可直接复用；新内容分块写入磁盘（saved）。
+    内容文件和链接到它的数据文件为只读，需要修改数据时请重新上传。
+    显示文件名与内容哈希的对应关系记录在上传文件清单中，同名文件换成新内容后，旧内容不再被引用时删除。
+    """
+    view = memoryview(buffer)
+    digest = hashlib.sha256()
+    for start in range(0, len(view), chunk_size):
+        digest.update(view[start:start + chunk_size])
+    sha256 = digest.hexdigest()
+
+    file_path = os.path.join(data_dir, file_name)
+    if os.path.exists(file_path) and get_content_hash(file_path) == sha256:
+        return 'unchanged', sha256
+
+    blob_path = _blob_path(data_dir, sha256, file_name)
+    if os.path.exists(blob_path):
+        status = 'linked'
+    else:
+        tmp_path = _tmp_path(blob_path)
+        with open(tmp_path, 'wb') as f:
+            for start in range(0, len(view), chunk_size):
+                f.write(view[start:start + chunk_size])
+        # 内容文件只读，通过硬链接共用它的数据文件不能被原地修改（否则会改动其他同内容的文件）
+        os.chmod(tmp_path, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(tmp_path, blob_path)
+        status = 'saved'
+
+    # 显示文件名硬链接到内容文件（不再写入数据），文件系统不支持硬链接时才复制
+    tmp_path = _tmp_path(file_path)
+    try:
+        os.link(blob_path, tmp_path)
+    except OSError:
+        shutil.copyfile(blob_path, tmp_path)
+    try:
+        os.replace(tmp_path, file_path)
+    except PermissionError:
+        # Windows下不能直接替换只读文件
+        remove_file(file_path)
+        os.replace(tmp_path, file_path)
+
+    manifest = load_upload_manifest(data_dir)
+    previous = manifest.get(file_name)
+    manifest[file_name] = sha256
+    _save_upload_manifest(data_dir, manifest)
+    if previous is not None and previous != sha256:
+        _release_blob(data_dir, manifest, previous, file_name)
+
+    # 预先写入缓存清单，之后读取该文件时无需重新计算哈希
+    file_stat = os.stat(file_path)
+    _save_manifest(file_path, {'path': os.path.abspath(file_path), 'mtime_ns': file_stat.st_mtime_ns, 'size': file_stat.st_size, 'sha256': sha256})
+    return status, sha256
+
+# 删除文件后更新上传文件清单
+def forget_upload(file_name, data_dir):
+    """从上传文件清单中移除文件名，内容不再被任何文件名引用时删除内容文件"""
+    manifest = load_upload_manifest(data_dir)
+    sha256 = manifest.pop(file_name, None)
+    if sha256 is None:
+        return
+    _save_upload_manifest(data_dir, manifest)
+    _release_blob(data_dir, manifest, sha256, file_name)
+
+# 删除不再被任何文件名引用的内容文件
+def _release_blob(data_dir, manifest, sha256, file_name):
+    if sha256 not in manifest.values():
+        blob_path = _blob_path(data_dir, sha256, file_name)
+        if os.path.exists(blob_path):
+            remove_file(blob_path)
+
+# 删除文件（上传的文件为只读）
+def remove_file(path):
+    """删除文件；Windows下只读文件不能直接删除，先取消只读再删除"""
+    try:
+        os.remove(path)
+    except PermissionError:
+        os.chmod(path, stat.S_IREAD | stat.S_IWRITE)
+        os.remove(path)
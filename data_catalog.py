@@ -0,0 +1,101 @@
+import os
+import threading
+
+# 月份顺序（用于排序和按月份查询）
+MONTH_ORDER = ['1月', '2月', '3月', '4月', '5月', '6月', '7月', '8月', '9月', '10月', '11月', '12月']
+
+# 支持的数据文件格式
+DATA_FILE_EXTENSIONS = ('.xlsx', '.csv')
+
+# 默认数据目录
+DEFAULT_DATA_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'data')
+
+# 各数据目录的文件目录（进程内共享，所有页面和会话共用）：数据目录 -> {'mtime_ns': 目录修改时间, 'entries': 文件列表}
+_catalogs = {}
+_catalog_lock = threading.Lock()
+
+# 获取月份的排序键（无法识别的月份排在最后）
+def month_key(month):
+    """返回月份在MONTH_ORDER中的位置"""
+    return MONTH_ORDER.index(month) if month in MONTH_ORDER else len(MONTH_ORDER)
+
+# 从文件名中提取月份（文件名格式为"9月.xlsx"）
+def month_of_file(file_name):
+    """返回文件名对应的月份标签"""
+    return os.path.splitext(os.path.basename(file_name))[0]
+
+# 扫描数据目录
+def _scan(data_dir):
+    """列出数据目录下的数据文件，只在此时解析一次月份，并按月份顺序排序"""
+    entries = []
+    with os.scandir(data_dir) as it:
+        for item in it:
+            ext = os.path.splitext(item.name)[1]
+            if ext not in DATA_FILE_EXTENSIONS or not item.is_file():
+                continue
+            month = month_of_file(item.name)
+            entries.append({
+                'name': item.name,
+                'path': item.path,
+                'ext': ext,
+                'month': month,
+                'month_key': month_key(month),
+                'valid_month': month in MONTH_ORDER,
+            })
+    entries.sort(key=lambda entry: (entry['month_key'], entry['month'], entry['ext']))
+    return entries
+
+# 获取数据目录的文件目录
+def get_catalog(data_dir=DEFAULT_DATA_DIR):
+    """返回数据目录下的数据文件列表（按月份排序）
+
+    文件目录在进程内缓存，每次调用只检查一次数据目录的修改时间：添加、删除或重命名文件都会改变目录的修改时间，
+    此时才重新扫描目录，其余情况直接返回缓存的列表，避免每次页面刷新都列出和排序整个目录。
+    """
+    data_dir = os.path.abspath(data_dir)
+    try:
+        mtime_ns = os.stat(data_dir).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    with _catalog_lock:
+        catalog = _catalogs.get(data_dir)
+        if catalog is None or catalog['mtime_ns'] != mtime_ns:
+            catalog = {'mtime_ns': mtime_ns, 'entries': _scan(data_dir)}
+            _catalogs[data_dir] = catalog
+        return catalog['entries']
+
+# 使文件目录失效
+def invalidate(data_dir=None):
+    """清除文件目录缓存（上传或删除文件后调用，避免文件系统的修改时间精度不足导致目录未刷新）"""
+    with _catalog_lock:
+        if data_dir is None:
+            _catalogs.clear()
+        else:
+            _catalogs.pop(os.path.abspath(data_dir), None)
+
+# 列出数据文件名
+def list_files(data_dir=DEFAULT_DATA_DIR, extensions=DATA_FILE_EXTENSIONS):
+    """返回指定格式的数据文件名（按月份排序）"""
+    return [entry['name'] for entry in get_catalog(data_dir) if entry['ext'] in extensions]
+
+# 列出月份数据文件
+def month_files(data_dir=DEFAULT_DATA_DIR):
+    """返回文件名为有效月份的.xlsx文件（按月份排序）"""
+    return [entry for entry in get_catalog(data_dir) if entry['ext'] == '.xlsx' and entry['valid_month']]
+
+# 按文件名查找数据文件
+def find_file(file_name, data_dir=DEFAULT_DATA_DIR):
+    """返回文件名对应的文件信息，不存在时返回None"""
+    for entry in get_catalog(data_dir):
+        if entry['name'] == file_name:
+            return entry
+    return None
+
+# 各月份对应的数据文件
+def month_sources(data_dir=DEFAULT_DATA_DIR):
+    """返回有效月份 -> 该月份的数据文件信息（按月份排序）；同一月份同时有.xlsx和.csv文件时以.xlsx文件为准"""
+    sources = {}
+    for entry in get_catalog(data_dir):
+        if entry['valid_month'] and (entry['month'] not in sources or entry['ext'] == '.xlsx'):
+            sources[entry['month']] = entry
+    return sources
@@ -1,6 +1,11 @@
 import streamlit as st
 import pandas as pd
 import os
+import data_cache
+import data_catalog
+import data_store
+import html_table
+import sidebar
 
 # 确保data目录存在
 if not os.path.exists('data'):
@@ -18,33 +23,71 @@ def data_import():
     # 确保data目录存在
     os.makedirs(data_dir, exist_ok=True)
     
-    # 文件上传 - 文件选择后自动保存到磁盘
-    uploaded_file = st.file_uploader(
+    # 文件上传 - 文件选择后自动保存到磁盘（支持一次选择多个文件）
+    uploaded_files = st.file_uploader(
         "上传数据文件",
         type=['xlsx', 'csv'],
-        help="支持.xlsx和.csv格式的文件"
+        accept_multiple_files=True,
+        help="支持.xlsx和.csv格式的文件，可一次选择多个文件批量导入"
     )
     
-    # 文件选择后自动保存到磁盘
-    if uploaded_file is not None:
-        try:
-            # 保存上传的文件到data文件夹
-            file_path = os.path.join(data_dir, uploaded_file.name)
-            with open(file_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
+    # 只处理本次新选择的文件（页面刷新后上传控件中仍保留已处理过的文件）
+    new_files = [f for f in uploaded_files or [] if f.file_id not in st.session_state.processed_uploads]
+    if new_files:
+        summary = []
+        saved_paths = []
+        for uploaded_file in new_files:
+            st.session_state.processed_uploads.add(uploaded_file.file_id)
+            try:
+                # 按内容哈希保存上传的文件到data文件夹，内容已上传过时不再重复写盘和解析
+                status, _ = data_cache.save_upload(uploaded_file.getbuffer(), uploaded_file.name, data_dir)
+                summary.append({'file': uploaded_file.name, 'upload': status, 'status': None, 'message': ''})
+                saved_paths.append(os.path.join(data_dir, uploaded_file.name))
+            except Exception as e:
+                summary.append({'file': uploaded_file.name, 'upload': 'error', 'status': 'error', 'message': f"保存文件失败: {str(e)}"})
+        data_catalog.invalidate(data_dir)
+        
+        # 当前文件的内容被替换时，需要重新加载完整数据
+        if any(item['file'] == st.session_state.current_file and item['upload'] in ('saved', 'linked') for item in summary):
+            sidebar.set_dataset('raw_data', None)
+        
+        # 在进程池中并发解析并校验所有文件，通过校验的文件写入数据库
+        if saved_paths:
+            progress_bar = st.progress(0.0, text="正在解析和校验上传的文件...")
             
-            # 显示成功信息
-            st.success(f"✅ 文件已成功上传并保存: {uploaded_file.name}")
+            def update_progress(done, total, result):
+                progress_bar.progress(done / total, text=f"正在解析和校验上传的文件（{done}/{total}）：{result['file']}")
             
-            # 立即更新文件列表并强制刷新页面
-            st.rerun()
-        except Exception as e:
-            st.error(f"❌ 保存文件失败: {str(e)}")
+            results = data_store.sync_files(saved_paths, data_dir, on_progress=update_progress, required_columns=data_store.REQUIRED_COLUMNS)
+            progress_bar.empty()
+            results = iter(results)
+            for item in summary:
+                if item['upload'] != 'error':
+                    result = next(results)
+                    item['status'] = result['status']
+                    item['message'] = result['message']
+                    item['violations'] = result.get('violations', 0)
+        
+        # 全部文件处理完成后只刷新一次页面，刷新后显示每个文件的导入结果
+        st.session_state.upload_summary = summary
+        st.rerun()
+    
+    # 显示最近一次批量导入的结果
+    if st.session_state.upload_summary:
+        upload_labels = {'saved': '新文件', 'linked': '内容与已上传的文件相同，已直接复用', 'unchanged': '文件未变化'}
+        for item in st.session_state.upload_summary:
+            if item['status'] == 'error':
+                st.error(f"❌ {item['file']}：{item['message']}")
+            elif item.get('violations'):
+                st.warning(f"⚠️ {item['file']}：{upload_labels[item['upload']]}，已导入，发现{item['violations']}条数据校验问题")
+            else:
+                state = '已导入' if item['status'] == 'loaded' else '数据库中已是最新'
+                st.success(f"✅ {item['file']}：{upload_labels[item['upload']]}，{state}")
     
     # 或者选择本地已有的数据文件
     st.write("或者选择本地已有的数据文件:")
-    # 每次都重新读取文件列表，确保实时更新
-    data_files = [f for f in os.listdir(data_dir) if f.endswith(('.xlsx', '.csv'))]
+    # 文件列表来自共享的文件目录，数据目录有变化时自动刷新
+    data_files = data_catalog.list_files(data_dir)
     
     if not data_files:
         st.info("📂 目前没有数据文件，请先上传文件")
@@ -66,12 +109,10 @@ def data_import():
                 read_data_clicked = True
                 try:
                     file_path = os.path.join(data_dir, selected_file)
-                    # 根据文件扩展名选择正确的读取方法
-                    if selected_file.endswith('.xlsx'):
-                        df = pd.read_excel(file_path)
-                    elif selected_file.endswith('.csv'):
-                        # 从第3行开始读取.csv文件（跳过前2行）
-                        df = pd.read_csv(file_path, skiprows=2)
+                    # 只读取前10行用于预览（.csv文件从第3行开始读取），完整文件在后台解析并统计元数据，
+                    # 分析页面需要完整数据时再通过列式缓存加载
+                    if selected_file.endswith(('.xlsx', '.csv')):
+                        df = data_cache.peek_data_file(file_path, nrows=10)
                     else:
                         error_message = f"❌ 不支持的文件格式: {selected_file}"
                         read_data_clicked = False
@@ -80,8 +121,10 @@ def data_import():
                         # 删除所有Unnamed:开头的列（空列）
                         df = df.loc[:, ~df.columns.str.contains('^Unnamed:')]
                         
-                        st.session_state.raw_data = df
+                        st.session_state.preview_data = df
+                        sidebar.set_dataset('raw_data', None)
                         st.session_state.current_file = selected_file
+                        data_cache.start_metadata_job(file_path)
                         success_message = f"✅ 成功读取文件: {selected_file}"
                 except Exception as e:
                     error_message = f"❌ 读取文件失败: {str(e)}"
@@ -93,15 +136,20 @@ def data_import():
                     file_path = os.path.join(data_dir, selected_file)
                     
                     if os.path.exists(file_path):
-                        if os.access(file_path, os.W_OK):
-                            os.remove(file_path)
+                        # 上传的文件为只读，能否删除取决于data目录的写权限
+                        if os.access(data_dir, os.W_OK):
+                            data_cache.remove_file(file_path)
+                            data_cache.forget_upload(selected_file, data_dir)
+                            data_catalog.invalidate(data_dir)
+                            # 同时从数据库中删除该月份，其他页面不再显示已删除文件的数据
+                            data_store.prune_months(data_dir)
                             st.success(f"✅ 成功删除文件: {selected_file}")
                             
                             if hasattr(st.session_state, 'current_file') and st.session_state.current_file == selected_file:
                                 st.session_state.current_file = None
-                                st.session_state.raw_data = None
-                                st.session_state.cleaned_data = None
-                                st.session_state.filled_data = None
+                                st.session_state.preview_data = None
+                                for name in ('raw_data', 'cleaned_data', 'filled_data'):
+                                    sidebar.set_dataset(name, None)
                             
                             st.rerun()
                         else:
@@ -126,62 +174,48 @@ def data_import():
             st.warning("⚠️ 请先选择要读取的文件")
     
     # 显示原始数据
-    if st.session_state.raw_data is not None:
+    if st.session_state.current_file is not None and st.session_state.preview_data is not None:
         st.markdown('<div class="subsection-header-with-icon">👀 数据预览</div>', unsafe_allow_html=True)
         
         # 使用HTML生成居中对齐的表格
-        preview_data = st.session_state.raw_data.head(10)
-        html_table = f"""
-        <table style="width: 100%; border-collapse: collapse; text-align: center;">
-            <thead>
-                <tr style="background-color: #f0f2f6;">
-                    {''.join([f'<th style="padding: 8px; border: 1px solid #ddd;">{col}</th>' for col in preview_data.columns])}
-                </tr>
-            </thead>
-            <tbody>
-                {''.join([
-                    '<tr>' + ''.join([f'<td style="padding: 8px; border: 1px solid #ddd;">{val}</td>' for val in row]) + '</tr>'
-                    for _, row in preview_data.iterrows()
-                ])}
-            </tbody>
-        </table>
-        """
-        st.markdown(html_table, unsafe_allow_html=True)
+        html_table.render_html_table(st.session_state.preview_data, numbered=False)
+        
+        # 完整文件的行数、数据类型和缺失值在后台统计，统计完成前先显示提示
+        file_path = os.path.join(data_dir, st.session_state.current_file)
+        metadata = data_cache.get_metadata(file_path) if os.path.exists(file_path) else None
+        if metadata is None:
+            metadata_error = data_cache.metadata_job_error(file_path)
+            if metadata_error:
+                st.error(f"❌ 统计完整文件信息失败: {metadata_error}")
+            else:
+                data_cache.start_metadata_job(file_path)
+                st.info("⏳ 正在后台统计完整文件的行数、数据类型和缺失值，请稍后刷新")
+                st.button("刷新统计信息", key="refresh_metadata_btn")
+            return
         
         # 数据基本信息
         st.markdown('<div class="subsection-header-with-icon">📊 数据基本信息</div>', unsafe_allow_html=True)
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("行数", st.session_state.raw_data.shape[0])
+            st.metric("行数", metadata['rows'])
         with col2:
-            st.metric("列数", st.session_state.raw_data.shape[1])
+            st.metric("列数", len(metadata['columns']))
         with col3:
-            missing_count = st.session_state.raw_data.isnull().sum().sum()
+            missing_count = sum(col['null'] for col in metadata['columns'])
             st.metric("缺失值数量", missing_count)
+        with col4:
+            # 加载时已压缩数据类型（班级等列转为分类类型，分数列转为float32或小整数）
+            saved_ratio = 1 - metadata['memory_after'] / metadata['memory_before'] if metadata['memory_before'] else 0
+            st.metric("内存占用", f"{metadata['memory_after'] / 1024:.1f} KB", delta=f"节省 {saved_ratio:.0%}", delta_color="off")
         
         # 列信息
         st.markdown('<div class="subsection-header-with-icon">📋 列信息</div>', unsafe_allow_html=True)
         col_info = pd.DataFrame({
-            '列名': st.session_state.raw_data.columns,
-            '数据类型': st.session_state.raw_data.dtypes.values,
-            '非空值数量': st.session_state.raw_data.count().values,
-            '缺失值数量': st.session_state.raw_data.isnull().sum().values
+            '列名': [col['name'] for col in metadata['columns']],
+            '数据类型': [col['dtype'] for col in metadata['columns']],
+            '非空值数量': [col['non_null'] for col in metadata['columns']],
+            '缺失值数量': [col['null'] for col in metadata['columns']]
         })
         
-        # 使用HTML生成居中对齐的列信息表格
-        col_html_table = f"""
-        <table style="width: 100%; border-collapse: collapse; text-align: center;">
-            <thead>
-                <tr style="background-color: #f0f2f6;">
-                    {''.join([f'<th style="padding: 8px; border: 1px solid #ddd;">{col}</th>' for col in col_info.columns])}
-                </tr>
-            </thead>
-            <tbody>
-                {''.join([
-                    '<tr>' + ''.join([f'<td style="padding: 8px; border: 1px solid #ddd;">{val}</td>' for val in row]) + '</tr>'
-                    for _, row in col_info.iterrows()
-                ])}
-            </tbody>
-        </table>
-        """
-        st.markdown(col_html_table, unsafe_allow_html=True)
+        # 使用HTML生成居中对齐的表格
+        html_table.render_html_table(col_info, numbered=False)
@@ -1,54 +1,45 @@
 import streamlit as st
 import pandas as pd
+import sidebar
+import html_table
+import fill_engine
+import processing_pipeline
 
 # 数据处理功能（合并数据清洗和填充空值）
 def data_processing():
     """实现数据处理功能，包括数据清洗和填充空值"""
     st.markdown('<h2 class="section-header">🔧 数据处理</h2>', unsafe_allow_html=True)
     
-    if st.session_state.raw_data is None:
+    raw_data = sidebar.get_raw_data()
+    
+    if raw_data is None:
         st.warning("请先导入数据")
     else:
         # 数据清洗部分
         st.markdown('<div class="subsection-header-with-icon">🔍 数据质量分析</div>', unsafe_allow_html=True)
         
-        # 显示数据质量问题
-        df = st.session_state.raw_data
-        missing_values = df.isnull().sum()
-        duplicate_rows = df.duplicated().sum()
+        # 显示数据质量问题（质量报告按数据指纹缓存，页面刷新时不再重新统计）
+        raw_key = sidebar.dataset_key('raw_data')
+        report = processing_pipeline.quality(raw_key)
+        missing_values = report['missing']
         
         col1, col2 = st.columns(2)
         with col1:
-            st.metric("重复行数", duplicate_rows)
+            st.metric("重复行数", report['duplicate_rows'])
         with col2:
-            st.metric("有缺失值的列数", (missing_values > 0).sum())
+            st.metric("有缺失值的列数", len(report['missing_columns']))
         
         # 缺失值详情
-        if missing_values.sum() > 0:
+        if report['missing_total'] > 0:
             st.markdown('<div class="subsection-header-with-icon">⚠️ 缺失值详情</div>', unsafe_allow_html=True)
             missing_df = pd.DataFrame({
                 '列名': missing_values[missing_values > 0].index,
                 '缺失值数量': missing_values[missing_values > 0].values,
-                '缺失比例': (missing_values[missing_values > 0].values / len(df) * 100).round(2)
+                '缺失比例': (missing_values[missing_values > 0].values / report['rows'] * 100).round(2)
             })
             
             # 使用HTML生成居中对齐的表格
-            html_table = f"""
-            <table style="width: 100%; border-collapse: collapse; text-align: center;">
-                <thead>
-                    <tr style="background-color: #f0f2f6;">
-                        {''.join([f'<th style="padding: 8px; border: 1px solid #ddd;">{col}</th>' for col in missing_df.columns])}
-                    </tr>
-                </thead>
-                <tbody>
-                    {''.join([
-                        '<tr>' + ''.join([f'<td style="padding: 8px; border: 1px solid #ddd;">{val}</td>' for val in row]) + '</tr>'
-                        for _, row in missing_df.iterrows()
-                    ])}
-                </tbody>
-            </table>
-            """
-            st.markdown(html_table, unsafe_allow_html=True)
+            html_table.render_html_table(missing_df, numbered=False)
         
         # 数据清洗选项
         st.markdown('<div class="subsection-header-with-icon">🧹 数据清洗选项</div>', unsafe_allow_html=True)
@@ -56,19 +47,14 @@ def data_processing():
         remove_duplicates = st.checkbox("删除重复行", value=True)
         
         if st.button("开始清洗数据", type="primary", key="clean_data_button"):
-            cleaned_df = df.copy()
-            
-            # 删除重复行
-            if remove_duplicates:
-                before_count = len(cleaned_df)
-                cleaned_df = cleaned_df.drop_duplicates()
-                after_count = len(cleaned_df)
-                removed_count = before_count - after_count
-                if removed_count > 0:
-                    st.success(f"已删除 {removed_count} 行重复数据")
+            # 清洗结果按(原始数据指纹, 清洗选项)缓存，重复清洗同一份数据直接返回已有结果
+            cleaned_key, clean_report = processing_pipeline.run_stage('clean', raw_key, owner=sidebar.session_id(), remove_duplicates=remove_duplicates)
+            if clean_report['removed'] > 0:
+                st.success(f"已删除 {clean_report['removed']} 行重复数据")
             
             # 保存清洗后的数据
-            st.session_state.cleaned_data = cleaned_df
+            sidebar.set_dataset_key('cleaned_data', cleaned_key)
+            cleaned_df = sidebar.get_dataset('cleaned_data')
             st.success("数据清洗完成！")
             
             # 显示清洗后的数据
@@ -76,58 +62,54 @@ def data_processing():
             preview_data = cleaned_df.head(10)
             
             # 使用HTML生成居中对齐的表格
-            html_table = f"""
-            <table style="width: 100%; border-collapse: collapse; text-align: center;">
-                <thead>
-                    <tr style="background-color: #f0f2f6;">
-                        {''.join([f'<th style="padding: 8px; border: 1px solid #ddd;">{col}</th>' for col in preview_data.columns])}
-                    </tr>
-                </thead>
-                <tbody>
-                    {''.join([
-                        '<tr>' + ''.join([f'<td style="padding: 8px; border: 1px solid #ddd;">{val}</td>' for val in row]) + '</tr>'
-                        for _, row in preview_data.iterrows()
-                    ])}
-                </tbody>
-            </table>
-            """
-            st.markdown(html_table, unsafe_allow_html=True)
+            html_table.render_html_table(preview_data, numbered=False)
             
             # 清洗前后对比
             col1, col2 = st.columns(2)
             with col1:
-                st.metric("原始数据行数", len(df))
+                st.metric("原始数据行数", clean_report['rows_before'])
             with col2:
-                st.metric("清洗后数据行数", len(cleaned_df))
+                st.metric("清洗后数据行数", clean_report['rows_after'])
         
         # 分隔线
         st.markdown("---")
         
         
         # 使用原始数据或清洗后的数据
-        if st.session_state.cleaned_data is not None:
+        if sidebar.get_dataset('cleaned_data') is not None:
             use_cleaned = st.checkbox("使用清洗后的数据", value=True, key="use_cleaned_checkbox")
-            df_fill = st.session_state.cleaned_data if use_cleaned else st.session_state.raw_data
+            fill_key = sidebar.dataset_key('cleaned_data') if use_cleaned else raw_key
         else:
-            df_fill = st.session_state.raw_data
+            fill_key = raw_key
             use_cleaned = False
         
-        # 显示有缺失值的列
-        missing_cols = df_fill.columns[df_fill.isnull().any()].tolist()
+        # 显示有缺失值的列（直接使用缓存的质量报告）
+        fill_quality = processing_pipeline.quality(fill_key)
+        missing_cols = fill_quality['missing_columns']
         
         if not missing_cols:
             st.success("数据中没有缺失值！")
         else:
             st.markdown(f'<div class="subsection-header-with-icon">⚠️ 发现 {len(missing_cols)} 列有缺失值</div>', unsafe_allow_html=True)
-            st.info("将使用0填充所有缺失值")
+            
+            # 选择填充方式（数据中有班级和月份列时才能按班级沿用上月或跨月份插值）
+            fill_df = sidebar.get_dataset('cleaned_data') if use_cleaned else raw_data
+            strategies = fill_engine.available_strategies(fill_df)
+            strategy = st.selectbox(
+                "填充方式",
+                strategies,
+                format_func=lambda name: fill_engine.FILL_STRATEGIES[name],
+                key="fill_strategy"
+            )
+            st.info("将使用0填充所有缺失值" if strategy == 'zero' else f"将对数值列的缺失值{fill_engine.FILL_STRATEGIES[strategy]}")
             
             # 执行填充
             if st.button("执行填充", type="primary", key="fill_data_button"):
-                filled_df = df_fill.copy()
-                filled_df = filled_df.fillna(0)
+                filled_key, fill_report = processing_pipeline.run_stage('fill', fill_key, owner=sidebar.session_id(), strategy=strategy)
                 
                 # 保存填充后的数据
-                st.session_state.filled_data = filled_df
+                sidebar.set_dataset_key('filled_data', filled_key)
+                filled_df = sidebar.get_dataset('filled_data')
                 st.success("空值填充完成！")
                 
                 # 显示填充后的数据
@@ -135,26 +117,11 @@ def data_processing():
                 preview_data = filled_df.head(10)
                 
                 # 使用HTML生成居中对齐的表格
-                html_table = f"""
-                <table style="width: 100%; border-collapse: collapse; text-align: center;">
-                    <thead>
-                        <tr style="background-color: #f0f2f6;">
-                            {''.join([f'<th style="padding: 8px; border: 1px solid #ddd;">{col}</th>' for col in preview_data.columns])}
-                        </tr>
-                    </thead>
-                    <tbody>
-                        {''.join([
-                            '<tr>' + ''.join([f'<td style="padding: 8px; border: 1px solid #ddd;">{val}</td>' for val in row]) + '</tr>'
-                            for _, row in preview_data.iterrows()
-                        ])}
-                    </tbody>
-                </table>
-                """
-                st.markdown(html_table, unsafe_allow_html=True)
+                html_table.render_html_table(preview_data, numbered=False)
                 
                 # 填充前后对比
                 col1, col2 = st.columns(2)
                 with col1:
-                    st.metric("填充前缺失值", df_fill.isnull().sum().sum())
+                    st.metric("填充前缺失值", fill_quality['missing_total'])
                 with col2:
-                    st.metric("填充后缺失值", filled_df.isnull().sum().sum())
+                    st.metric("填充后缺失值", fill_report['quality']['missing_total'])
@@ -0,0 +1,696 @@
+import hashlib
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+import data_cache
+import data_catalog
+import trend_engine
+import validation_engine
+
+# 数据库文件名（位于数据目录的缓存目录下）
+STORE_FILE_NAME = 'facts.sqlite'
+
+# 并发解析数据文件的默认进程数（0表示使用CPU核数）
+DEFAULT_MAX_WORKERS = int(os.environ.get('DATA_LOAD_WORKERS', '0'))
+
+# 默认数据目录
+DEFAULT_DATA_DIR = data_catalog.DEFAULT_DATA_DIR
+
+# 批量导入时每个数据文件必须包含的列
+REQUIRED_COLUMNS = ['编号', '班级', '初始分数', '实际班级总分']
+
+# 长表结构：每个班级、月份、考核项目一行，并按班级、月份、考核项目建立索引
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS months (
+    month TEXT PRIMARY KEY,
+    month_key INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    columns TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS facts (
+    month TEXT NOT NULL,
+    row_no INTEGER NOT NULL,
+    class TEXT,
+    item TEXT NOT NULL,
+    value,
+    PRIMARY KEY (month, row_no, item)
+);
+CREATE INDEX IF NOT EXISTS idx_facts_class ON facts (class, month);
+CREATE INDEX IF NOT EXISTS idx_facts_item ON facts (item, month);
+CREATE TABLE IF NOT EXISTS cube_month_item (
+    month TEXT NOT NULL,
+    item TEXT NOT NULL,
+    total REAL,
+    mean REAL,
+    count INTEGER,
+    plus INTEGER,
+    minus INTEGER,
+    nonzero INTEGER,
+    min REAL,
+    max REAL,
+    PRIMARY KEY (month, item)
+);
+CREATE TABLE IF NOT EXISTS cube_class_month_item (
+    class TEXT,
+    month TEXT NOT NULL,
+    item TEXT NOT NULL,
+    total REAL,
+    mean REAL,
+    count INTEGER,
+    plus INTEGER,
+    minus INTEGER,
+    nonzero INTEGER,
+    min REAL,
+    max REAL,
+    PRIMARY KEY (class, month, item)
+);
+CREATE INDEX IF NOT EXISTS idx_cube_class_item ON cube_class_month_item (item, month);
+CREATE TABLE IF NOT EXISTS cube_months (
+    month TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS trend_sums (
+    class TEXT NOT NULL,
+    item TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    sum_x REAL NOT NULL,
+    sum_y REAL NOT NULL,
+    sum_xy REAL NOT NULL,
+    sum_xx REAL NOT NULL,
+    first_key INTEGER,
+    first_month TEXT,
+    first_value REAL,
+    last_key INTEGER,
+    last_month TEXT,
+    last_value REAL,
+    PRIMARY KEY (class, item)
+);
+CREATE TABLE IF NOT EXISTS trend_months (
+    month TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS violations (
+    month TEXT NOT NULL,
+    row_no INTEGER NOT NULL,
+    class TEXT,
+    rule TEXT NOT NULL,
+    item TEXT NOT NULL,
+    value REAL,
+    expected REAL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_violations_month ON violations (month, row_no);
+CREATE TABLE IF NOT EXISTS validated_months (
+    month TEXT PRIMARY KEY,
+    rules TEXT NOT NULL
+);
+"""
+
+# 聚合结果中各统计量的列名（与cube表的列一一对应）
+CUBE_STATS = {
+    'total': '总和',
+    'mean': '平均值',
+    'count': '次数',
+    'plus': '加分次数',
+    'minus': '扣分次数',
+    'nonzero': '非零次数',
+    'min': '最小值',
+    'max': '最大值'
+}
+
+# 只统计数值记录（文本列不参与聚合）
+_CUBE_AGGREGATES = (
+    'SUM(value), AVG(value), COUNT(value), SUM(value > 0), SUM(value < 0), SUM(value != 0), MIN(value), MAX(value) '
+    "FROM facts WHERE month = ? AND typeof(value) IN ('integer', 'real')"
+)
+
+# 打开数据库连接
+def connect(data_dir=DEFAULT_DATA_DIR):
+    """打开数据目录对应的数据库连接，首次使用时自动建表"""
+    store_path = os.path.join(data_cache.get_cache_dir(os.path.join(data_dir, STORE_FILE_NAME)), STORE_FILE_NAME)
+    conn = sqlite3.connect(store_path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(SCHEMA)
+    # 补建尚未聚合的月份（例如升级前已导入的数据）
+    missing = conn.execute('SELECT month FROM months WHERE month NOT IN (SELECT month FROM cube_months)').fetchall()
+    unfolded = conn.execute('SELECT month FROM cube_months WHERE month NOT IN (SELECT month FROM trend_months)').fetchall()
+    # 补做尚未校验或校验规则已修改的月份
+    rules = validation_engine.load_rules()
+    unvalidated = conn.execute(
+        'SELECT month FROM months WHERE month NOT IN (SELECT month FROM validated_months WHERE rules = ?)',
+        (rules['version'],)
+    ).fetchall()
+    if missing or unfolded or unvalidated:
+        with conn:
+            for (month,) in missing:
+                _rebuild_cube(conn, month)
+            for (month,) in unfolded:
+                _fold_trend(conn, month, {}, _class_month_values(conn, month))
+                conn.execute('INSERT INTO trend_months (month) VALUES (?)', (month,))
+            for (month,) in unvalidated:
+                _write_violations(conn, month, _violation_rows(month, _month_frame(conn, month), rules), rules['version'])
+    return conn
+
+# 重新计算一个月的聚合结果
+def _rebuild_cube(conn, month):
+    """按(月份, 考核项目)和(班级, 月份, 考核项目)重新聚合一个月的数据，只扫描该月份的记录，
+    并把该月份新旧数据的差异合并到回归充分统计量中"""
+    folded = conn.execute('SELECT 1 FROM trend_months WHERE month = ?', (month,)).fetchone() is not None
+    old_values = _class_month_values(conn, month) if folded else {}
+    _clear_cube(conn, month)
+    conn.execute(f'INSERT INTO cube_month_item SELECT month, item, {_CUBE_AGGREGATES} GROUP BY month, item', (month,))
+    conn.execute(f'INSERT INTO cube_class_month_item SELECT class, month, item, {_CUBE_AGGREGATES} GROUP BY class, month, item', (month,))
+    conn.execute('INSERT INTO cube_months (month) VALUES (?)', (month,))
+    _fold_trend(conn, month, old_values, _class_month_values(conn, month))
+    conn.execute('INSERT OR IGNORE INTO trend_months (month) VALUES (?)', (month,))
+
+# 删除一个月的聚合结果
+def _delete_cube(conn, month):
+    if conn.execute('SELECT 1 FROM trend_months WHERE month = ?', (month,)).fetchone() is not None:
+        _fold_trend(conn, month, _class_month_values(conn, month), {})
+        conn.execute('DELETE FROM trend_months WHERE month = ?', (month,))
+    _clear_cube(conn, month)
+
+# 清空一个月的聚合表记录
+def _clear_cube(conn, month):
+    conn.execute('DELETE FROM cube_month_item WHERE month = ?', (month,))
+    conn.execute('DELETE FROM cube_class_month_item WHERE month = ?', (month,))
+    conn.execute('DELETE FROM cube_months WHERE month = ?', (month,))
+
+# 读取一个月每个(班级, 考核项目)的平均分
+def _class_month_values(conn, month):
+    rows = conn.execute(
+        'SELECT class, item, mean FROM cube_class_month_item WHERE month = ? AND class IS NOT NULL AND count > 0',
+        (month,)
+    ).fetchall()
+    return {(cls, item): value for cls, item, value in rows}
+
+# 查找某个(班级, 考核项目)除指定月份外的第一个或最后一个月份
+def _trend_boundary(conn, cls, item, exclude_month, last=False):
+    order = 'DESC' if last else 'ASC'
+    return conn.execute(
+        'SELECT m.month_key, c.month, c.mean FROM cube_class_month_item c JOIN months m ON m.month = c.month '
+        'WHERE c.class = ? AND c.item = ? AND c.month != ? AND c.count > 0 '
+        f'ORDER BY m.month_key {order}, c.month {order} LIMIT 1',
+        (cls, item, exclude_month)
+    ).fetchone() or (None, None, None)
+
+# 把一个月的数据合并到回归充分统计量中
+def _fold_trend(conn, month, old_values, new_values):
+    """从每个(班级, 考核项目)的累计量中减去该月份的旧数据、加上新数据
+
+    累计量为以月份序号为x、月平均分为y的n、Σx、Σy、Σxy、Σx²，以及第一个和最后一个月份的分数，
+    只读写该月份涉及的行，与历史月份数量无关（只有该月份原本是某班级的首末月份且新数据中没有该班级时，才需要重新查找首末月份）。
+    """
+    x = data_catalog.month_key(month)
+    for key in set(old_values) | set(new_values):
+        cls, item = key
+        row = conn.execute(
+            'SELECT n, sum_x, sum_y, sum_xy, sum_xx, first_key, first_month, first_value, last_key, last_month, last_value '
+            'FROM trend_sums WHERE class = ? AND item = ?',
+            key
+        ).fetchone()
+        n, sum_x, sum_y, sum_xy, sum_xx, first_key, first_month, first_value, last_key, last_month, last_value = row or (0, 0.0, 0.0, 0.0, 0.0, None, None, None, None, None, None)
+
+        for values, sign in ((old_values, -1), (new_values, 1)):
+            if key in values:
+                y = values[key]
+                n += sign
+                sum_x += sign * x
+                sum_y += sign * y
+                sum_xy += sign * x * y
+                sum_xx += sign * x * x
+
+        if n <= 0:
+            conn.execute('DELETE FROM trend_sums WHERE class = ? AND item = ?', key)
+            continue
+
+        # 更新第一个和最后一个月份
+        if key in new_values:
+            y = new_values[key]
+            if first_month is None or first_month == month or (x, month) < (first_key, first_month):
+                first_key, first_month, first_value = x, month, y
+            if last_month is None or last_month == month or (x, month) > (last_key, last_month):
+                last_key, last_month, last_value = x, month, y
+        else:
+            if first_month == month:
+                first_key, first_month, first_value = _trend_boundary(conn, cls, item, month)
+            if last_month == month:
+                last_key, last_month, last_value = _trend_boundary(conn, cls, item, month, last=True)
+
+        conn.execute(
+            'INSERT OR REPLACE INTO trend_sums (class, item, n, sum_x, sum_y, sum_xy, sum_xx, '
+            'first_key, first_month, first_value, last_key, last_month, last_value) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (cls, item, n, sum_x, sum_y, sum_xy, sum_xx, first_key, first_month, first_value, last_key, last_month, last_value)
+        )
+
+# 校验一个月的宽表，返回违规记录
+def _violation_rows(month, df, rules=None):
+    violations = validation_engine.validate(df, month, rules=rules)
+    # 行号换算为df的行索引（与facts表的row_no一致）
+    row_numbers = df.index[violations['行号'].to_numpy(dtype='int64')]
+    return [
+        (month, int(row_no), cls, rule, str(item), None if value != value else float(value), None if expected != expected else float(expected), message)
+        for row_no, cls, rule, item, value, expected, message in zip(
+            row_numbers, violations['班级'].map(lambda val: val if val is None else str(val)), violations['规则'],
+            violations['列'], violations['值'], violations['期望值'], violations['说明']
+        )
+    ]
+
+# 写入一个月的校验结果（替换该月份原有结果）
+def _write_violations(conn, month, violations, version):
+    _delete_violations(conn, month)
+    conn.executemany(
+        'INSERT INTO violations (month, row_no, class, rule, item, value, expected, message) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        violations
+    )
+    conn.execute('INSERT INTO validated_months (month, rules) VALUES (?, ?)', (month, version))
+
+# 删除一个月的校验结果
+def _delete_violations(conn, month):
+    conn.execute('DELETE FROM violations WHERE month = ?', (month,))
+    conn.execute('DELETE FROM validated_months WHERE month = ?', (month,))
+
+# 将列转换为数值类型，空白文本视为缺失值；存在无法转换的文本时返回None
+def _coerce_numeric(series):
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype('float64')
+    cleaned = series.map(lambda val: None if isinstance(val, str) and not val.strip() else val)
+    converted = pd.to_numeric(cleaned, errors='coerce')
+    if converted.notna().sum() != cleaned.notna().sum():
+        return None
+    return converted.astype('float64')
+
+# 将一个月的宽表转换为长表记录
+def _to_fact_rows(month, df):
+    df = df.loc[:, ~df.columns.astype(str).str.startswith('Unnamed:')]
+    classes = df['班级'].where(df['班级'].notna(), None).astype(object).tolist() if '班级' in df.columns else [None] * len(df)
+    rows = []
+    columns = []
+    for col in df.columns:
+        if col == '班级':
+            columns.append([col, 'object'])
+            continue
+        values = _coerce_numeric(df[col])
+        if values is None:
+            # 文本列按原样存储
+            values = df[col].where(df[col].notna(), None).astype(object).map(lambda val: val if val is None else str(val))
+            columns.append([str(col), 'object'])
+        else:
+            columns.append([str(col), str(df[col].dtype) if pd.api.types.is_numeric_dtype(df[col]) else 'float64'])
+        for row_no, (cls, val) in enumerate(zip(classes, values.tolist())):
+            if val is None or val != val:
+                continue
+            rows.append((month, row_no, cls, str(col), val))
+    return rows, columns
+
+# 在工作进程中解析数据文件，检查必需列，转换为长表记录，并按校验规则检查数据
+def _parse_month_file(file_path, required_columns=None):
+    df = data_cache.read_data_file(file_path)
+    missing = [col for col in required_columns or [] if col not in df.columns]
+    if missing:
+        raise ValueError(f"缺少必需列: {'、'.join(missing)}")
+    month = data_catalog.month_of_file(file_path)
+    rules = validation_engine.load_rules()
+    rows, columns = _to_fact_rows(month, df)
+    return rows, columns, _violation_rows(month, df, rules), rules['version']
+
+# 将一个月的长表记录和校验结果写入数据库（替换该月份原有数据）
+def _write_month(conn, month, file_name, sha256, parsed):
+    rows, columns, violations, version = parsed
+    with conn:
+        conn.execute('DELETE FROM facts WHERE month = ?', (month,))
+        conn.executemany('INSERT INTO facts (month, row_no, class, item, value) VALUES (?, ?, ?, ?, ?)', rows)
+        conn.execute(
+            'INSERT OR REPLACE INTO months (month, month_key, source, sha256, columns) VALUES (?, ?, ?, ?, ?)',
+            (month, data_catalog.month_key(month), file_name, sha256, json.dumps(columns, ensure_ascii=False))
+        )
+        # 只重新聚合发生变化的月份
+        _rebuild_cube(conn, month)
+        _write_violations(conn, month, violations, version)
+
+# 将数据文件同步到数据库
+def sync_files(file_paths, data_dir=DEFAULT_DATA_DIR, max_workers=None, on_progress=None, required_columns=None):
+    """将指定的月份数据文件同步到数据库，只重新导入内容发生变化的文件
+
+    有多个文件需要重新解析时，在进程池中并发解析，进程数不超过max_workers
+    （默认取环境变量DATA_LOAD_WORKERS，未设置时为CPU核数）；解析结果统一在当前进程写入数据库。
+    每完成一个文件调用一次on_progress(已完成数, 文件总数, 结果)。
+    指定required_columns时，缺少其中任一列的文件不写入数据库，结果为error。
+    文件名不是有效月份（例如"9月.xlsx"）的文件，以及同一月份中不作为数据来源的文件（同时有.xlsx和.csv文件时以.xlsx为准，
+    见data_catalog.month_sources）也不写入数据库，结果为error。
+    导入的文件按validation_engine的校验规则检查，违规记录写入violations表（数据照常导入）。
+
+    返回与file_paths顺序一致的同步结果列表，包含file、month、status（loaded/unchanged/error）、message
+    和violations（本次导入发现的违规记录数）。
+    """
+    results = {}
+
+    def report(index, file_name, month, status, message='', violations=0):
+        results[index] = {'file': file_name, 'month': month, 'status': status, 'message': message, 'violations': violations}
+        if on_progress is not None:
+            on_progress(len(results), len(file_paths), results[index])
+
+    conn = connect(data_dir)
+    try:
+        # 先用内容哈希找出需要重新解析的文件
+        pending = []
+        for index, file_path in enumerate(file_paths):
+            file_name = os.path.basename(file_path)
+            month = data_catalog.month_of_file(file_name)
+            if month not in data_catalog.MONTH_ORDER:
+                report(index, file_name, month, 'error', "文件名不是有效的月份（应为'X月.xlsx'或'X月.csv'）")
+                continue
+            source = data_catalog.month_sources(os.path.dirname(os.path.abspath(file_path))).get(month)
+            if source is not None and source['name'] != file_name:
+                report(index, file_name, month, 'error', f"{month}已有数据文件{source['name']}，以该文件的数据为准")
+                continue
+            try:
+                sha256 = data_cache.get_content_hash(file_path)
+            except Exception as e:
+                report(index, file_name, month, 'error', str(e))
+                continue
+            stored = conn.execute('SELECT sha256 FROM months WHERE month = ? AND source = ?', (month, file_name)).fetchone()
+            if stored is not None and stored[0] == sha256:
+                report(index, file_name, month, 'unchanged')
+            else:
+                pending.append((index, file_path, file_name, month, sha256))
+
+        workers = min(max_workers or DEFAULT_MAX_WORKERS or os.cpu_count() or 1, len(pending))
+        if workers <= 1:
+            for index, file_path, file_name, month, sha256 in pending:
+                try:
+                    parsed = _parse_month_file(file_path, required_columns)
+                    _write_month(conn, month, file_name, sha256, parsed)
+                    report(index, file_name, month, 'loaded', violations=len(parsed[2]))
+                except Exception as e:
+                    report(index, file_name, month, 'error', str(e))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(_parse_month_file, item[1], required_columns): item for item in pending}
+                for future in as_completed(futures):
+                    index, file_path, file_name, month, sha256 = futures[future]
+                    try:
+                        parsed = future.result()
+                        _write_month(conn, month, file_name, sha256, parsed)
+                        report(index, file_name, month, 'loaded', violations=len(parsed[2]))
+                    except Exception as e:
+                        report(index, file_name, month, 'error', str(e))
+    finally:
+        conn.close()
+    return [results[index] for index in range(len(file_paths))]
+
+# 同步整个数据目录
+def sync_data_dir(data_dir=DEFAULT_DATA_DIR, max_workers=None, on_progress=None):
+    """同步数据目录下各月份的数据文件，并删除数据文件已不存在的月份"""
+    sources = data_catalog.month_sources(data_dir)
+    results = sync_files([entry['path'] for entry in sources.values()], data_dir, max_workers, on_progress)
+    prune_months(data_dir)
+    return results
+
+# 删除数据文件已不存在的月份
+def prune_months(data_dir=DEFAULT_DATA_DIR):
+    """从数据库中删除数据目录下已没有对应数据文件的月份（以及数据来源已换成其他文件的月份，下次读取时重新导入），
+    同时删除这些月份的聚合结果、趋势统计和校验结果，返回删除的月份"""
+    sources = data_catalog.month_sources(data_dir)
+    conn = connect(data_dir)
+    try:
+        stale = [month for month, source in conn.execute('SELECT month, source FROM months').fetchall()
+                 if month not in sources or sources[month]['name'] != source]
+        with conn:
+            for month in stale:
+                _delete_cube(conn, month)
+                _delete_violations(conn, month)
+                conn.execute('DELETE FROM facts WHERE month = ?', (month,))
+                conn.execute('DELETE FROM months WHERE month = ?', (month,))
+    finally:
+        conn.close()
+    return stale
+
+# 列出数据库中的月份
+def list_months(data_dir=DEFAULT_DATA_DIR):
+    """按月份顺序返回数据库中已有的月份"""
+    conn = connect(data_dir)
+    try:
+        return [row[0] for row in conn.execute('SELECT month FROM months ORDER BY month_key, month')]
+    finally:
+        conn.close()
+
+# 列出有数据文件的月份
+def source_months(data_dir=DEFAULT_DATA_DIR):
+    """按月份顺序返回数据库中仍有对应数据文件的月份（不包括数据文件已删除或数据来源已换成其他文件的月份）"""
+    sources = data_catalog.month_sources(data_dir)
+    conn = connect(data_dir)
+    try:
+        rows = conn.execute('SELECT month, source FROM months ORDER BY month_key, month').fetchall()
+    finally:
+        conn.close()
+    return [month for month, source in rows if month in sources and sources[month]['name'] == source]
+
+# 数据库内容指纹
+def dataset_fingerprint(data_dir=DEFAULT_DATA_DIR):
+    """返回数据库中所有月份内容的指纹（由各月份及其文件内容哈希计算），任一月份导入、更新或删除后都会变化"""
+    conn = connect(data_dir)
+    try:
+        rows = conn.execute('SELECT month, sha256 FROM months ORDER BY month').fetchall()
+    finally:
+        conn.close()
+    return hashlib.sha256(json.dumps(rows).encode('utf-8')).hexdigest()
+
+# 列出数据库中的班级
+def list_classes(months=None, data_dir=DEFAULT_DATA_DIR):
+    """返回数据库中（可限定月份）出现过的班级，从聚合结果中查询，不读取明细数据"""
+    conditions = ['class IS NOT NULL']
+    params = []
+    _in_clause('month', months, conditions, params)
+    conn = connect(data_dir)
+    try:
+        rows = conn.execute(f"SELECT DISTINCT class FROM cube_class_month_item WHERE {' AND '.join(conditions)} ORDER BY class", params).fetchall()
+    finally:
+        conn.close()
+    return [row[0] for row in rows]
+
+# 生成IN查询条件
+def _in_clause(column, values, conditions, params):
+    if values is not None:
+        values = list(values)
+        conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+
+# 查询长表数据
+def query_facts(classes=None, months=None, items=None, data_dir=DEFAULT_DATA_DIR):
+    """按班级、月份、考核项目查询长表数据，参数为None时表示不筛选
+
+    返回包含月份、班级、考核项目、分数列的DataFrame，按月份顺序排列。
+    """
+    conditions = []
+    params = []
+    _in_clause('f.class', classes, conditions, params)
+    _in_clause('f.month', months, conditions, params)
+    _in_clause('f.item', items, conditions, params)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    sql = (
+        'SELECT f.month, f.class, f.item, f.value FROM facts f '
+        'JOIN months m ON m.month = f.month '
+        f'{where} ORDER BY m.month_key, f.month, f.row_no'
+    )
+    conn = connect(data_dir)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    return pd.DataFrame(rows, columns=['月份', '班级', '考核项目', '分数'])
+
+# 查询某个班级所有月份的数据
+def class_history(class_name, data_dir=DEFAULT_DATA_DIR):
+    """返回指定班级在所有月份的长表数据"""
+    return query_facts(classes=[class_name], data_dir=data_dir)
+
+# 查询某个考核项目在所有班级的数据
+def item_across_classes(item, months=None, data_dir=DEFAULT_DATA_DIR):
+    """返回指定考核项目在所有班级（可限定月份）的长表数据"""
+    return query_facts(months=months, items=[item], data_dir=data_dir)
+
+# 获取月份的列信息
+def month_columns(month, data_dir=DEFAULT_DATA_DIR):
+    """返回月份数据文件的列名（与原始文件顺序一致），月份不存在时返回空列表"""
+    conn = connect(data_dir)
+    try:
+        row = conn.execute('SELECT columns FROM months WHERE month = ?', (month,)).fetchone()
+    finally:
+        conn.close()
+    return [name for name, _ in json.loads(row[0])] if row else []
+
+# 查询(月份, 考核项目)聚合结果
+def month_item_stats(months=None, items=None, data_dir=DEFAULT_DATA_DIR):
+    """从预先聚合的结果中查询每个月份、每个考核项目的总和、平均值、次数、加分/扣分/非零次数、最小值和最大值
+
+    返回包含月份、考核项目和CUBE_STATS中各统计量列的DataFrame，按月份顺序排列。
+    """
+    conditions = []
+    params = []
+    _in_clause('c.month', months, conditions, params)
+    _in_clause('c.item', items, conditions, params)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    sql = (
+        f"SELECT c.month, c.item, {', '.join('c.' + stat for stat in CUBE_STATS)} FROM cube_month_item c "
+        'JOIN months m ON m.month = c.month '
+        f'{where} ORDER BY m.month_key, c.month, c.item'
+    )
+    conn = connect(data_dir)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    return pd.DataFrame(rows, columns=['月份', '考核项目'] + list(CUBE_STATS.values()))
+
+# 查询(班级, 月份, 考核项目)聚合结果
+def class_item_stats(classes=None, months=None, items=None, data_dir=DEFAULT_DATA_DIR):
+    """从预先聚合的结果中查询每个班级、月份、考核项目的统计量，返回包含班级、月份、考核项目和各统计量列的DataFrame"""
+    conditions = []
+    params = []
+    _in_clause('c.class', classes, conditions, params)
+    _in_clause('c.month', months, conditions, params)
+    _in_clause('c.item', items, conditions, params)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    sql = (
+        f"SELECT c.class, c.month, c.item, {', '.join('c.' + stat for stat in CUBE_STATS)} FROM cube_class_month_item c "
+        'JOIN months m ON m.month = c.month '
+        f'{where} ORDER BY m.month_key, c.month, c.class, c.item'
+    )
+    conn = connect(data_dir)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    return pd.DataFrame(rows, columns=['班级', '月份', '考核项目'] + list(CUBE_STATS.values()))
+
+# 查询按月份增量维护的趋势统计
+def trend_summary(item='实际班级总分', classes=None, data_dir=DEFAULT_DATA_DIR):
+    """返回数据库中所有月份下每个班级该考核项目的趋势斜率、首末月份变化、有效月份数和最近月份
+
+    结果直接由增量维护的回归充分统计量计算，不需要读取历史月份的数据；列与trend_engine.trend_stats一致。
+    """
+    conditions = ['item = ?']
+    params = [item]
+    _in_clause('class', classes, conditions, params)
+    conn = connect(data_dir)
+    try:
+        rows = conn.execute(
+            'SELECT class, n, sum_x, sum_y, sum_xy, sum_xx, first_value, last_value, last_month FROM trend_sums '
+            f"WHERE {' AND '.join(conditions)} ORDER BY class",
+            params
+        ).fetchall()
+    finally:
+        conn.close()
+    sums = pd.DataFrame(rows, columns=['班级', 'n', 'sum_x', 'sum_y', 'sum_xy', 'sum_xx', 'first_value', 'last_value', '最近月份']).set_index('班级')
+    return pd.DataFrame({
+        '趋势斜率': trend_engine.slopes_from_sums(sums['n'], sums['sum_x'], sums['sum_y'], sums['sum_xy'], sums['sum_xx']),
+        '总分变化': sums['last_value'] - sums['first_value'],
+        '数据月份数': sums['n'],
+        '最近月份': sums['最近月份']
+    }, index=sums.index)
+
+# 把一个月的长表记录还原为宽表（列顺序和数据类型与原始文件一致）
+def _pivot_month(month_facts, stored_columns, month_rows=None):
+    rows = month_facts if month_rows is None else month_rows
+    classes = rows.drop_duplicates('row_no').set_index('row_no')['class'].sort_index()
+    wide = month_facts.pivot(index='row_no', columns='item', values='value').reindex(classes.index)
+    wide['班级'] = classes
+    wide = wide.reindex(columns=[name for name, _ in stored_columns])
+    for name, dtype in stored_columns:
+        if dtype == 'object' or name == '班级':
+            continue
+        values = pd.to_numeric(wide[name])
+        if dtype.startswith('int') and values.notna().all():
+            values = values.astype(dtype)
+        wide[name] = values
+    return wide
+
+# 用已打开的连接读取一个月的宽表（行号与导入时的行位置一致）
+def _month_frame(conn, month):
+    stored_columns = json.loads(conn.execute('SELECT columns FROM months WHERE month = ?', (month,)).fetchone()[0])
+    rows = conn.execute('SELECT month, row_no, class, item, value FROM facts WHERE month = ?', (month,)).fetchall()
+    return _pivot_month(pd.DataFrame(rows, columns=['month', 'row_no', 'class', 'item', 'value']), stored_columns)
+
+# 将长表还原为与原始文件一致的宽表
+def load_months(months, with_month_column=True, data_dir=DEFAULT_DATA_DIR, columns=None):
+    """按给定月份顺序读取宽表数据并纵向合并，列顺序与原始文件一致，并压缩数据类型
+
+    指定columns时只从数据库中查询这些考核项目，返回的宽表只包含其中存在的列；行（班级）与不指定columns时一致，
+    不会因为所选项目的值为空而缺少班级。
+    """
+    months = list(months)
+    if not months:
+        return pd.DataFrame()
+    placeholders = ', '.join('?' * len(months))
+    sql = f'SELECT month, row_no, class, item, value FROM facts WHERE month IN ({placeholders})'
+    params = list(months)
+    if columns is not None:
+        items = [col for col in columns if col != '班级']
+        sql += f" AND item IN ({', '.join('?' * len(items))})"
+        params += items
+    conn = connect(data_dir)
+    try:
+        month_columns = dict(conn.execute(f'SELECT month, columns FROM months WHERE month IN ({placeholders})', months).fetchall())
+        rows = conn.execute(sql, params).fetchall()
+        # 只查询部分项目时，各月份的行和班级单独查询（与所选项目是否有值无关）
+        month_rows = None
+        if columns is not None:
+            month_rows = pd.DataFrame(
+                conn.execute(f'SELECT DISTINCT month, row_no, class FROM facts WHERE month IN ({placeholders})', months).fetchall(),
+                columns=['month', 'row_no', 'class']
+            )
+    finally:
+        conn.close()
+
+    facts = pd.DataFrame(rows, columns=['month', 'row_no', 'class', 'item', 'value'])
+    frames = []
+    for month in months:
+        if month not in month_columns:
+            continue
+        stored_columns = json.loads(month_columns[month])
+        if columns is not None:
+            stored_columns = [[name, dtype] for name, dtype in stored_columns if name in columns]
+        wide = _pivot_month(facts[facts['month'] == month], stored_columns,
+                            None if month_rows is None else month_rows[month_rows['month'] == month])
+        if with_month_column:
+            wide['月份'] = month
+        frames.append(wide)
+
+    if not frames:
+        return pd.DataFrame()
+    combined = pd.concat(frames, ignore_index=True)
+    combined.columns.name = None
+    # 压缩数据类型，月份列转换为按月份顺序排列的有序分类
+    month_categories = sorted(set(months), key=lambda month: (data_catalog.month_key(month), month))
+    return data_cache.normalize_dtypes(combined, month_categories=month_categories)
+
+# 查询数据校验结果
+def list_violations(months=None, rules=None, data_dir=DEFAULT_DATA_DIR):
+    """返回导入时发现的违规记录（可限定月份和规则），列与validation_engine.VIOLATION_COLUMNS一致，按月份和行号排列"""
+    conditions = []
+    params = []
+    _in_clause('v.month', months, conditions, params)
+    _in_clause('v.rule', rules, conditions, params)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    sql = (
+        'SELECT v.month, v.row_no, v.class, v.rule, v.item, v.value, v.expected, v.message FROM violations v '
+        'JOIN months m ON m.month = v.month '
+        f'{where} ORDER BY m.month_key, v.month, v.row_no, v.rowid'
+    )
+    conn = connect(data_dir)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    return pd.DataFrame(rows, columns=validation_engine.VIOLATION_COLUMNS).astype({'值': 'float64', '期望值': 'float64'})
+
+# 读取单个月份文件（先同步再从数据库读取）
+def read_month(file_path, data_dir=DEFAULT_DATA_DIR, columns=None):
+    """同步并读取单个月份数据文件，返回与原始文件列一致的宽表（指定columns时只返回这些列）"""
+    result = sync_files([file_path], data_dir)[0]
+    if result['status'] == 'error':
+        raise ValueError(result['message'])
+    return load_months([result['month']], with_month_column=False, data_dir=data_dir, columns=columns)
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+# 数据集内存预算（MB），可通过环境变量DATASET_MEMORY_MB调整
+MEMORY_BUDGET_BYTES = int(os.environ.get('DATASET_MEMORY_MB', '512')) * 1024 * 1024
+
+# 进程内共享的数据集（所有会话共用）：指纹 -> {'df': 数据, 'bytes': 内存占用, 'owners': 引用该数据集的会话}
+# 按最近使用的顺序排列，超出内存预算时从最久未使用且没有会话引用的数据集开始淘汰
+_datasets = OrderedDict()
+_registry_lock = threading.Lock()
+
+# 计算数据集的内容指纹
+def fingerprint(df):
+    """按列名、数据类型和全部数据计算指纹，内容相同的数据集指纹相同"""
+    header = '\x1f'.join(f'{col}\x1e{dtype}' for col, dtype in df.dtypes.items())
+    hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return hashlib.sha256(header.encode('utf-8') + hashed.tobytes()).hexdigest()
+
+# 淘汰超出预算的数据集（调用方需持有锁）
+def _evict():
+    total = sum(entry['bytes'] for entry in _datasets.values())
+    for key in list(_datasets):
+        if total <= MEMORY_BUDGET_BYTES:
+            break
+        if not _datasets[key]['owners']:
+            total -= _datasets.pop(key)['bytes']
+
+# 登记数据集
+def register(df, owner=None):
+    """登记数据集并由owner（例如会话ID）引用，返回数据集指纹；owner为None时只登记不引用
+
+    已有内容相同的数据集时直接使用已有的数据集（不再保留df），所有会话共用同一份数据。
+    登记后的数据集只读，需要修改时先复制。
+    """
+    key = fingerprint(df)
+    with _registry_lock:
+        entry = _datasets.get(key)
+        if entry is None:
+            entry = {'df': df, 'bytes': int(df.memory_usage(deep=True).sum()), 'owners': set()}
+            _datasets[key] = entry
+        if owner is not None:
+            entry['owners'].add(owner)
+        _datasets.move_to_end(key)
+        _evict()
+    return key
+
+# 引用已登记的数据集
+def retain(key, owner):
+    """owner引用已登记的数据集，数据集不存在（已被淘汰）时返回False"""
+    with _registry_lock:
+        entry = _datasets.get(key)
+        if entry is None:
+            return False
+        entry['owners'].add(owner)
+        _datasets.move_to_end(key)
+        return True
+
+# 获取数据集
+def get(key):
+    """按指纹返回数据集（只读），数据集不存在或已被淘汰时返回None"""
+    with _registry_lock:
+        entry = _datasets.get(key)
+        if entry is None:
+            return None
+        _datasets.move_to_end(key)
+        return entry['df']
+
+# 释放引用
+def release(key, owner):
+    """owner不再引用该数据集；没有任何引用的数据集在超出内存预算时被淘汰"""
+    with _registry_lock:
+        entry = _datasets.get(key)
+        if entry is not None:
+            entry['owners'].discard(owner)
+        _evict()
+
+# 清理已失效的引用
+def prune(is_alive):
+    """释放is_alive(owner)为False的引用（例如已关闭的会话），并按内存预算淘汰数据集"""
+    with _registry_lock:
+        for entry in _datasets.values():
+            entry['owners'] = {owner for owner in entry['owners'] if is_alive(owner)}
+        _evict()
+
+# 登记情况统计
+def stats():
+    """返回数据集数量、引用数和总内存占用"""
+    with _registry_lock:
+        return {
+            'datasets': len(_datasets),
+            'references': sum(len(entry['owners']) for entry in _datasets.values()),
+            'bytes': sum(entry['bytes'] for entry in _datasets.values()),
+            'budget_bytes': MEMORY_BUDGET_BYTES
+        }
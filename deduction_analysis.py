@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+# 每个班级列出的主要扣分项数量
+TOP_DEDUCTIONS = 3
+
+# 不属于考核项目的列（标识列和总分列）
+NON_SCORING_COLUMNS = ['编号', '班级', '班级教室', '初始分数', '实际班级总分', '月份']
+
+# 获取考核项目列
+def scoring_columns(df):
+    """返回df中的考核项目列（排除班级、编号、总分等非评分项和文本列）"""
+    return [col for col in df.columns if col not in NON_SCORING_COLUMNS and pd.api.types.is_numeric_dtype(df[col])]
+
+# 扣分矩阵
+def deduction_matrix(df):
+    """返回与df行对应的班级×考核项目扣分矩阵：负值保留原值，其余（加分、0分和空值）为NaN"""
+    values = df[scoring_columns(df)].to_numpy(dtype='float64', na_value=np.nan)
+    return pd.DataFrame(np.where(values < 0, values, np.nan), index=df.index, columns=scoring_columns(df))
+
+# 所有班级的主要扣分项
+def top_deductions(df, n=TOP_DEDUCTIONS):
+    """对整个班级×考核项目矩阵一次性找出每个班级扣分最多的n个考核项目，返回整理好的长表
+
+    每个班级的每个主要扣分项一行，包含班级、月份（df中有月份列时）、名次、考核项目、扣分列，
+    索引为该班级在df中的行索引，按df的行顺序和名次排列；没有扣分项的班级不出现在结果中。
+    用argpartition按行找到第n多的扣分，扣分相同时按考核项目的列顺序排列（与逐行排序的结果一致）。
+    """
+    matrix = deduction_matrix(df)
+    items = np.asarray(matrix.columns, dtype=object)
+    id_columns = [col for col in ['班级', '月份'] if col in df.columns]
+    columns = id_columns + ['名次', '考核项目', '扣分']
+    n = min(n, len(items))
+    if n <= 0 or len(df) == 0:
+        return pd.DataFrame(columns=columns, index=df.index[:0])
+
+    # 非扣分项记为+inf，扣分越多值越小
+    keys = np.nan_to_num(matrix.to_numpy(), nan=np.inf)
+    kth = np.take_along_axis(keys, np.argpartition(keys, n - 1, axis=1)[:, n - 1:n], axis=1)
+
+    # 比第n多的扣分更多的项目全部入选，与之相同的项目按列顺序补足n个
+    better = keys < kth
+    tied = keys == kth
+    selected = better | (tied & (np.cumsum(tied, axis=1) <= n - better.sum(axis=1, keepdims=True)))
+    selected &= np.isfinite(keys)
+
+    rows, cols = np.nonzero(selected)
+    order = np.lexsort((cols, keys[rows, cols], rows))
+    rows, cols = rows[order], cols[order]
+    # 每行的名次：行内的序号
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]]) if len(rows) else np.empty(0, dtype=np.int64)
+    rank = np.arange(len(rows)) - np.repeat(starts, np.diff(np.r_[starts, len(rows)])) + 1
+
+    result = df[id_columns].iloc[rows].copy()
+    result['名次'] = rank
+    result['考核项目'] = items[cols]
+    result['扣分'] = keys[rows, cols]
+    return result[columns]
+
+# 导出扣分明细
+def deductions_csv(tidy):
+    """把主要扣分项长表转换为CSV（带BOM，便于用Excel直接打开）"""
+    return tidy.to_csv(index=False).encode('utf-8-sig')
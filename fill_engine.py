@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import data_catalog
+
+# 缺失值填充方式
+FILL_STRATEGIES = {
+    'zero': '填充0',
+    'mean': '按列平均值填充',
+    'median': '按列中位数填充',
+    'ffill': '沿用上个月的值（按班级）',
+    'interpolate': '按月份线性插值（按班级）'
+}
+
+# 需要月份列的填充方式（在多个月份的数据中按班级计算）
+MONTH_STRATEGIES = ('ffill', 'interpolate')
+
+# 默认填充方式
+DEFAULT_STRATEGY = 'zero'
+
+# 可用的填充方式
+def available_strategies(df, class_col='班级', month_col='月份'):
+    """返回df可以使用的填充方式（有班级和月份列时才能按班级跨月份填充）"""
+    has_months = class_col in df.columns and month_col in df.columns
+    return [name for name in FILL_STRATEGIES if has_months or name not in MONTH_STRATEGIES]
+
+# 补齐班级×月份
+def complete_months(df, class_col='班级', month_col='月份'):
+    """为某些月份没有记录的班级补上空行（考核项目为缺失值），使每个班级在每个月份都有一行"""
+    classes = pd.unique(df[class_col].dropna())
+    months = pd.unique(df[month_col].dropna())
+    grid = pd.MultiIndex.from_product([classes, months], names=[class_col, month_col])
+    present = pd.MultiIndex.from_arrays([df[class_col], df[month_col]])
+    missing = grid[~grid.isin(present)]
+    if len(missing) == 0:
+        return df
+    extra = missing.to_frame(index=False)
+    for col in (class_col, month_col):
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            extra[col] = pd.Categorical(extra[col], categories=df[col].cat.categories, ordered=df[col].cat.ordered)
+    return pd.concat([df, extra], ignore_index=True)
+
+# 按班级跨月份填充一列（所有班级同时计算）
+def _fill_across_months(values, groups, x, strategy):
+    """values、groups、x已按班级和月份排序；ffill沿用同一班级上一个有效月份的值，
+    interpolate按月份位置在同一班级前后两个有效月份之间线性插值，首尾月份取最近的有效值"""
+    positions = pd.Series(np.where(np.isnan(values), np.nan, np.arange(len(values))))
+    grouped = positions.groupby(groups, sort=False)
+    prev = grouped.ffill().to_numpy()
+    if strategy == 'ffill':
+        return np.where(np.isnan(prev), np.nan, values[np.nan_to_num(prev).astype(np.int64)])
+
+    nxt = grouped.bfill().to_numpy()
+    prev_i = np.nan_to_num(prev).astype(np.int64)
+    next_i = np.nan_to_num(nxt).astype(np.int64)
+    both = ~np.isnan(prev) & ~np.isnan(nxt)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weight = (x - x[prev_i]) / (x[next_i] - x[prev_i])
+        interpolated = np.where(both & (next_i != prev_i), values[prev_i] + weight * (values[next_i] - values[prev_i]), values[prev_i])
+    filled = np.where(both, interpolated, np.nan)
+    filled = np.where(np.isnan(prev) & ~np.isnan(nxt), values[next_i], filled)
+    return np.where(~np.isnan(prev) & np.isnan(nxt), values[prev_i], filled)
+
+# 填充缺失值
+def fill_missing(df, strategy=DEFAULT_STRATEGY, columns=None, class_col='班级', month_col='月份', complete=False):
+    """按指定方式填充缺失值，返回新的数据（只替换有缺失值的列，其余列与df共用数据，df本身不会被修改）
+
+    zero：所有列的缺失值填充0（分类列先加入0这一类别）；mean/median：数值列按该列的平均值/中位数填充；
+    ffill：按班级沿用上一个有数据的月份的值；interpolate：按班级在前后两个有数据的月份之间按月份间隔线性插值，
+    首尾月份取最近月份的值。ffill和interpolate需要班级和月份列，按班级分组一次性计算所有列；
+    仍无法确定的值（例如班级在之前所有月份都没有数据）保持缺失。
+    columns为要填充的列（默认为所有数值列，zero为所有列）；complete为True时先为缺少某些月份的班级补上空行。
+    """
+    if strategy not in FILL_STRATEGIES:
+        raise ValueError(f"不支持的填充方式: {strategy}")
+    if strategy in MONTH_STRATEGIES and (class_col not in df.columns or month_col not in df.columns):
+        raise ValueError(f"{FILL_STRATEGIES[strategy]}需要'{class_col}'和'{month_col}'列")
+    if complete:
+        df = complete_months(df, class_col, month_col)
+
+    if columns is None:
+        columns = [col for col in df.columns if strategy == 'zero' or (
+            col not in (class_col, month_col) and pd.api.types.is_numeric_dtype(df[col]) and not isinstance(df[col].dtype, pd.CategoricalDtype))]
+    columns = [col for col in columns if df[col].isnull().any()]
+    filled_df = df.copy(deep=False)
+    if not columns:
+        return filled_df
+
+    if strategy == 'zero':
+        for col in columns:
+            values = df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.cat.add_categories([0])
+            filled_df[col] = values.fillna(0)
+        return filled_df
+
+    if strategy in ('mean', 'median'):
+        numeric = df[columns].astype('float64')
+        fill_values = getattr(numeric, strategy)()
+        for col in columns:
+            filled_df[col] = numeric[col].fillna(fill_values[col])
+        return filled_df
+
+    # 按班级、月份顺序排列后分组计算，再按原有顺序写回
+    codes = pd.factorize(df[class_col])[0]
+    months = df[month_col].astype(str)
+    x = months.map({month: data_catalog.month_key(month) for month in months.unique()}).to_numpy(dtype='float64')
+    order = np.lexsort((x, codes))
+    groups, xs = codes[order], x[order]
+    for col in columns:
+        values = df[col].to_numpy(dtype='float64', na_value=np.nan)
+        result = np.empty(len(values))
+        result[order] = _fill_across_months(values[order], groups, xs, strategy)
+        filled_df[col] = result
+    return filled_df
@@ -0,0 +1,152 @@
+import warnings
+import numpy as np
+import pandas as pd
+import data_catalog
+import trend_engine
+
+# 候选预测模型
+MODELS = {
+    'last_value': '最近值',
+    'linear': '线性趋势',
+    'theil_sen': 'Theil-Sen稳健趋势',
+    'holt': '阻尼Holt平滑'
+}
+
+# 阻尼Holt平滑参数（水平、趋势平滑系数和阻尼系数）
+HOLT_ALPHA = 0.5
+HOLT_BETA = 0.3
+HOLT_PHI = 0.9
+
+# 回测时至少使用的历史月份数
+MIN_TRAIN = 2
+
+# 预测区间对应的正态分位数（1.28约为80%区间）
+INTERVAL_Z = 1.28
+
+# 给出预测区间至少需要的回测次数（只有一次回测时误差无法反映波动，区间宽度可能为0）
+MIN_INTERVAL_ERRORS = 2
+
+# 最近值模型：取每个班级最后一个有效值
+def _last_value(values, x, x_next):
+    valid = ~np.isnan(values)
+    last = values.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+    return np.where(valid.any(axis=1), values[np.arange(len(values)), last], np.nan)
+
+# 线性趋势模型：最小二乘直线外推
+def _linear(values, x, x_next):
+    valid = ~np.isnan(values)
+    n = valid.sum(axis=1)
+    xs = np.where(valid, x, 0.0)
+    ys = np.where(valid, values, 0.0)
+    sum_x = xs.sum(axis=1)
+    sum_y = ys.sum(axis=1)
+    slope = trend_engine.slopes_from_sums(n, sum_x, sum_y, (xs * ys).sum(axis=1), (xs * xs).sum(axis=1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        intercept = (sum_y - slope * sum_x) / n
+    return intercept + slope * x_next
+
+# Theil-Sen稳健趋势模型：斜率取所有两两月份斜率的中位数，对个别异常月份不敏感
+def _theil_sen(values, x, x_next):
+    i, j = np.triu_indices(values.shape[1], 1)
+    with warnings.catch_warnings():
+        # 有效月份少于2个的班级结果为NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        slope = np.nanmedian((values[:, j] - values[:, i]) / (x[j] - x[i]), axis=1) if len(i) else np.full(len(values), np.nan)
+        intercept = np.nanmedian(values - slope[:, None] * x, axis=1)
+    return intercept + slope * x_next
+
+# h个月的阻尼趋势累计系数：φ + φ² + … + φ^h
+def _damped_sum(h, phi=HOLT_PHI):
+    return phi * (1 - phi ** h) / (1 - phi)
+
+# 阻尼Holt平滑模型：逐月更新水平和趋势（各班级同时计算），缺失的月份跳过
+def _holt(values, x, x_next, alpha=HOLT_ALPHA, beta=HOLT_BETA, phi=HOLT_PHI):
+    level = np.full(len(values), np.nan)
+    trend = np.zeros(len(values))
+    last_x = np.full(len(values), np.nan)
+    for col in range(values.shape[1]):
+        y = values[:, col]
+        observed = ~np.isnan(y)
+        start = observed & np.isnan(level)
+        level[start] = y[start]
+        last_x[start] = x[col]
+
+        update = observed & ~start
+        h = np.maximum(x[col] - last_x[update], 1)
+        predicted = level[update] + _damped_sum(h, phi) * trend[update]
+        new_level = alpha * y[update] + (1 - alpha) * predicted
+        trend[update] = beta * (new_level - level[update]) / h + (1 - beta) * phi ** h * trend[update]
+        level[update] = new_level
+        last_x[update] = x[col]
+    return level + _damped_sum(x_next - last_x, phi) * trend
+
+# 模型名称与预测函数
+_MODEL_FUNCTIONS = {
+    'last_value': _last_value,
+    'linear': _linear,
+    'theil_sen': _theil_sen,
+    'holt': _holt
+}
+
+# 滚动起点回测
+def backtest(values, x, min_train=MIN_TRAIN):
+    """对每个模型做滚动起点回测：依次用前t个月预测第t+1个月（所有班级同时计算）
+
+    返回{模型名称: 误差矩阵（班级×回测次数，实际值缺失的位置为NaN）}。
+    """
+    errors = {}
+    for name, func in _MODEL_FUNCTIONS.items():
+        columns = []
+        for t in range(min_train, values.shape[1]):
+            columns.append(func(values[:, :t], x[:t], x[t]) - values[:, t])
+        errors[name] = np.column_stack(columns) if columns else np.empty((len(values), 0))
+    return errors
+
+# 预测所有班级下个月的总分
+def forecast_next(matrix, x=None, min_train=MIN_TRAIN, z=INTERVAL_Z):
+    """对班级×月份矩阵中每个班级的月度序列同时拟合所有候选模型，按回测平均绝对误差为每个班级选择模型，
+    并给出下个月的点预测和预测区间（点预测 ± z × 该模型回测误差的均方根）
+
+    x为各月份的横坐标，默认使用月份序号，下个月为最后一个月份的下一个月。
+    回测误差不可用（有效月份太少）的班级使用最近值模型，且不给出预测区间；
+    所选模型的回测次数少于MIN_INTERVAL_ERRORS时同样不给出预测区间。
+    """
+    columns = ['预测模型', '下月预测', '预测下限', '预测上限', '回测平均误差', '回测次数']
+    if matrix.shape[1] == 0:
+        return pd.DataFrame(columns=columns, index=matrix.index)
+    values = matrix.to_numpy(dtype='float64')
+    if x is None:
+        x = np.array([data_catalog.month_key(month) for month in matrix.columns], dtype='float64')
+    x = np.asarray(x, dtype='float64')
+    x_next = x[-1] + 1
+    names = list(_MODEL_FUNCTIONS)
+
+    # 回测误差（模型×班级）
+    errors = backtest(values, x, min_train)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mae = np.vstack([np.nanmean(np.abs(errors[name]), axis=1) for name in names])
+        rmse = np.vstack([np.sqrt(np.nanmean(errors[name] ** 2, axis=1)) for name in names])
+    counts = np.vstack([(~np.isnan(errors[name])).sum(axis=1) for name in names])
+
+    # 全部模型的下月预测（模型×班级）
+    forecasts = np.vstack([_MODEL_FUNCTIONS[name](values, x, x_next) for name in names])
+
+    # 每个班级选择回测误差最小且能给出预测的模型
+    score = np.where(np.isnan(mae) | np.isnan(forecasts), np.inf, mae)
+    best = score.argmin(axis=0)
+    fallback = np.isinf(score.min(axis=0))
+    best[fallback] = names.index('last_value')
+
+    rows = np.arange(values.shape[0])
+    point = forecasts[best, rows]
+    spread = np.where(fallback | (counts[best, rows] < MIN_INTERVAL_ERRORS), np.nan, z * rmse[best, rows])
+
+    return pd.DataFrame({
+        '预测模型': np.array([MODELS[name] for name in names], dtype=object)[best],
+        '下月预测': point,
+        '预测下限': point - spread,
+        '预测上限': point + spread,
+        '回测平均误差': np.where(fallback, np.nan, mae[best, rows]),
+        '回测次数': np.where(fallback, 0, counts[best, rows])
+    }, index=matrix.index, columns=columns)
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+# 等级标注（从高到低）
+GRADE_LABELS = ['优秀', '良好', '合格', '待提高']
+
+# 默认等级规则：总分前5名为优秀，后5名为待提高，其余班级高于平均分为良好，否则为合格
+DEFAULT_TOP_N = 5
+DEFAULT_BOTTOM_N = 5
+DEFAULT_SPLIT = 'mean'
+
+# 中间班级的划分方式
+SPLIT_OPTIONS = {'mean': '平均分', 'median': '中位数'}
+
+# 计算等级标注
+def grade_bands(df, score_col='实际班级总分', group_col=None, top_n=DEFAULT_TOP_N, bottom_n=DEFAULT_BOTTOM_N, split=DEFAULT_SPLIT):
+    """按总分排名计算每个班级的等级标注，返回与df行对应的Series
+
+    排名在每组（例如每个月份，group_col为None时整张表为一组）内按总分从高到低计算一次，
+    与表格的显示顺序无关；并列时按原有顺序排名，缺失的总分排在最后。
+    前top_n名为优秀，后bottom_n名为待提高（两者重叠时优先为优秀），
+    其余班级总分高于组内平均分（split='median'时为中位数）为良好，否则为合格。
+    """
+    scores = pd.to_numeric(df[score_col], errors='coerce').astype('float64')
+    groups = df[group_col] if group_col is not None else pd.Series(0, index=df.index)
+    grouped = scores.groupby(groups, observed=True, sort=False)
+
+    rank = grouped.rank(method='first', ascending=False, na_option='bottom').to_numpy()
+    size = grouped.transform('size').to_numpy()
+    threshold = grouped.transform(split).to_numpy()
+    values = scores.to_numpy()
+
+    bands = np.select(
+        [rank <= top_n, rank > size - bottom_n, values > threshold],
+        ['优秀', '待提高', '良好'],
+        default='合格'
+    )
+    return pd.Series(bands, index=df.index, name='等级标注')
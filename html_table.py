@@ -0,0 +1,70 @@
+import math
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# 表格单元格和表头行的样式（与各页面原有的居中表格一致）
+CELL_STYLE = 'padding: 8px; border: 1px solid #ddd;'
+HEADER_ROW_STYLE = 'background-color: #f0f2f6;'
+
+# 分页表格的默认每页行数
+DEFAULT_PAGE_SIZE = 50
+
+# 转义HTML特殊字符（按列整体处理）
+def _escape(values):
+    return (values.str.replace('&', '&amp;', regex=False)
+                  .str.replace('<', '&lt;', regex=False)
+                  .str.replace('>', '&gt;', regex=False)
+                  .str.replace('"', '&quot;', regex=False))
+
+# 生成一列单元格的HTML
+def _column_cells(series):
+    values = pd.Series(series.astype(str).to_numpy(dtype=object))
+    return (f'<td style="{CELL_STYLE}">' + _escape(values) + '</td>').to_numpy()
+
+# 生成HTML表格
+def build_html_table(df, numbered=True, start=0, row_styles=None):
+    """按列向量化生成居中对齐的HTML表格（不逐行遍历数据）
+
+    numbered为True时在第一列显示从start+1开始的序号；row_styles为与df行对应的行样式（例如背景颜色）。
+    """
+    header_cells = [f'<th style="{CELL_STYLE}">序号</th>'] if numbered else []
+    header_cells += [f'<th style="{CELL_STYLE}">{col}</th>' for col in _escape(pd.Series([str(col) for col in df.columns], dtype=object))]
+
+    rows = np.full(len(df), '', dtype=object)
+    if numbered:
+        rows = rows + _column_cells(pd.Series(np.arange(start + 1, start + len(df) + 1)))
+    for col in range(df.shape[1]):
+        rows = rows + _column_cells(df.iloc[:, col])
+    if row_styles is None:
+        rows = '<tr>' + rows + '</tr>'
+    else:
+        rows = '<tr style="' + np.asarray(row_styles, dtype=object).astype(str).astype(object) + '">' + rows + '</tr>'
+
+    return (
+        '<table style="width: 100%; border-collapse: collapse; text-align: center;">'
+        f'<thead><tr style="{HEADER_ROW_STYLE}">{"".join(header_cells)}</tr></thead>'
+        f'<tbody>{"".join(rows)}</tbody>'
+        '</table>'
+    )
+
+# 显示HTML表格（支持分页）
+def render_html_table(df, numbered=True, page_size=None, key=None, row_styles=None):
+    """在页面中显示居中对齐的HTML表格
+
+    指定page_size且行数超过page_size时分页显示，只把当前页的行生成HTML发送到浏览器，
+    此时需要提供key用于区分页码选择控件。row_styles为与df行对应的行样式。
+    """
+    start = 0
+    if page_size is not None and len(df) > page_size:
+        page_count = math.ceil(len(df) / page_size)
+        col1, col2 = st.columns([0.2, 0.8])
+        with col1:
+            page = st.number_input("页码", min_value=1, max_value=page_count, value=1, step=1, key=f"{key}_page")
+        with col2:
+            st.caption(f"共 {len(df)} 行，第 {page}/{page_count} 页")
+        start = (page - 1) * page_size
+        df = df.iloc[start:start + page_size]
+        if row_styles is not None:
+            row_styles = np.asarray(row_styles, dtype=object)[start:start + page_size]
+    st.markdown(build_html_table(df, numbered, start, row_styles), unsafe_allow_html=True)
@@ -0,0 +1,109 @@
+import threading
+from collections import OrderedDict
+import dataset_registry
+import fill_engine
+
+# 处理结果缓存的最大条目数（进程内共享，超过时淘汰最久未使用的结果）
+MAX_CACHE_ENTRIES = 256
+
+# 处理结果缓存：(输入数据指纹, 处理步骤, 参数) -> (输出数据指纹, 报告)
+_results = OrderedDict()
+_results_lock = threading.Lock()
+
+# 数据质量报告
+def quality_report(df):
+    """统计数据的行数、重复行数和每列的缺失值数量"""
+    missing = df.isnull().sum()
+    return {
+        'rows': len(df),
+        'duplicate_rows': int(df.duplicated().sum()),
+        'missing': missing,
+        'missing_columns': missing.index[missing > 0].tolist(),
+        'missing_total': int(missing.sum())
+    }
+
+# 清洗步骤
+def _clean(df, remove_duplicates=True):
+    cleaned_df = df
+    if remove_duplicates:
+        duplicated = df.duplicated()
+        if duplicated.any():
+            cleaned_df = df[~duplicated]
+    return cleaned_df, {'rows_before': len(df), 'rows_after': len(cleaned_df), 'removed': len(df) - len(cleaned_df)}
+
+# 填充步骤
+def _fill(df, strategy=fill_engine.DEFAULT_STRATEGY):
+    filled_df = fill_engine.fill_missing(df, strategy)
+    return filled_df, {'filled_columns': df.columns[df.isnull().any() & filled_df.notnull().all()].tolist()}
+
+# 处理步骤：名称 -> 处理函数(数据, **参数) -> (输出数据, 报告)
+STAGES = {
+    'clean': _clean,
+    'fill': _fill
+}
+
+# 查询缓存的处理结果（输出数据已被淘汰时视为未缓存）
+def _lookup(key):
+    with _results_lock:
+        cached = _results.get(key)
+        if cached is None:
+            return None
+        _results.move_to_end(key)
+    output_key, report = cached
+    if output_key is not None and dataset_registry.get(output_key) is None:
+        return None
+    return cached
+
+# 保存处理结果
+def _store(key, value):
+    with _results_lock:
+        _results[key] = value
+        _results.move_to_end(key)
+        while len(_results) > MAX_CACHE_ENTRIES:
+            _results.popitem(last=False)
+
+# 数据质量报告（按数据指纹缓存）
+def quality(input_key):
+    """返回已登记数据集的数据质量报告，同一份数据只统计一次"""
+    key = (input_key, 'quality', ())
+    cached = _lookup(key)
+    if cached is not None:
+        return cached[1]
+    df = dataset_registry.get(input_key)
+    if df is None:
+        raise KeyError(f"数据集不存在或已被淘汰: {input_key}")
+    report = quality_report(df)
+    _store(key, (None, report))
+    return report
+
+# 执行处理步骤
+def run_stage(stage, input_key, owner=None, **params):
+    """对已登记的数据集执行处理步骤，返回(输出数据指纹, 报告)
+
+    结果按(输入数据指纹, 处理步骤, 参数)缓存，重复执行直接返回缓存的结果；输出数据登记到数据集登记表
+    （由owner引用），与输入相同时直接返回输入的指纹，不复制数据。报告中的quality为输出数据的质量报告。
+    """
+    key = (input_key, stage, tuple(sorted(params.items())))
+    cached = _lookup(key)
+    if cached is not None:
+        output_key, report = cached
+        if owner is not None:
+            dataset_registry.retain(output_key, owner)
+        return output_key, report
+
+    df = dataset_registry.get(input_key)
+    if df is None:
+        raise KeyError(f"数据集不存在或已被淘汰: {input_key}")
+    output_df, report = STAGES[stage](df, **params)
+    output_key = input_key if output_df is df else dataset_registry.register(output_df, owner)
+    if owner is not None:
+        dataset_registry.retain(output_key, owner)
+    report['quality'] = quality(output_key)
+    _store(key, (output_key, report))
+    return output_key, report
+
+# 清空处理结果缓存
+def clear_cache():
+    """清空进程内的处理结果缓存"""
+    with _results_lock:
+        _results.clear()
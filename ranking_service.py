@@ -0,0 +1,147 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import data_store
+import dataset_registry
+
+# 默认排名人数和排名列
+DEFAULT_K = 5
+DEFAULT_COLUMN = '实际班级总分'
+
+# 不参与排名的列（标识列）
+NON_RANKING_COLUMNS = ['编号', '班级', '班级教室', '月份']
+
+# 排名结果缓存的最大条目数（进程内共享，超过时淘汰最久未使用的结果）
+MAX_CACHE_ENTRIES = 256
+
+# 排名结果缓存：(数据指纹, 排名列, K, 方向, 月份, 年级) -> 排名行的位置（数据库中的排名为排名结果）
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+# 规范化年级前缀
+def normalize_grade(grade):
+    """把'2023'、'23'、'2023级'等写法统一为四位年份'2023'，空值返回None"""
+    if grade is None:
+        return None
+    digits = ''.join(ch for ch in str(grade) if ch.isdigit())
+    if not digits:
+        return None
+    return '20' + digits if len(digits) == 2 else digits
+
+# 提取班级所属年级
+def class_grades(classes):
+    """按班级名称开头的年份提取年级（'2023汽修1班'和'23汽修1班'都为'2023'），无法识别时为NaN"""
+    grades = pd.Series(classes, dtype=object).astype(str).str.extract(r'^(\d{4}|\d{2})', expand=False)
+    return grades.where(grades.str.len() != 2, '20' + grades)
+
+# 列出班级中出现的年级
+def list_grades(classes):
+    """返回班级名称中出现的所有年级（按年份排序）"""
+    return sorted(class_grades(pd.unique(pd.Series(classes, dtype=object))).dropna().unique())
+
+# 可用于排名的列
+def ranking_columns(columns):
+    """返回可用于排名的列（排除班级、编号等标识列），实际班级总分排在最前"""
+    columns = [col for col in columns if col not in NON_RANKING_COLUMNS and not str(col).startswith('Unnamed:')]
+    if DEFAULT_COLUMN in columns:
+        columns.remove(DEFAULT_COLUMN)
+        columns.insert(0, DEFAULT_COLUMN)
+    return columns
+
+# 部分选择前K个
+def select_k(values, k, largest=True):
+    """返回values中最大（largest=False时为最小）的k个值的位置，按排名排列
+
+    用argpartition在线性时间内找到第k个值，只对选出的k个值排序，不对整列排序；
+    缺失值不参与排名，并列时位置靠前的优先（与nlargest/nsmallest的keep='first'一致）。
+    """
+    keys = np.asarray(values, dtype='float64')
+    if largest:
+        keys = -keys
+    valid = np.flatnonzero(~np.isnan(keys))
+    keys = keys[valid]
+    k = min(int(k), len(keys))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(keys):
+        boundary = keys[np.argpartition(keys, k - 1)[k - 1]]
+        better = np.flatnonzero(keys < boundary)
+        chosen = np.concatenate([better, np.flatnonzero(keys == boundary)[:k - len(better)]])
+    else:
+        chosen = np.arange(len(keys))
+    return valid[chosen[np.lexsort((chosen, keys[chosen]))]]
+
+# 查询或计算排名结果
+def _cached(key, compute):
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key].copy()
+    result = compute()
+    with _cache_lock:
+        _cache[key] = result
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return result.copy()
+
+# 筛选后计算排名行的位置
+def _rank_positions(df, k, column, largest, month, grade):
+    mask = np.ones(len(df), dtype=bool)
+    if month is not None and '月份' in df.columns:
+        mask &= (df['月份'].astype(str) == str(month)).to_numpy()
+    if grade is not None:
+        mask &= (class_grades(df['班级'].to_numpy()) == grade).to_numpy()
+    positions = np.flatnonzero(mask)
+    values = pd.to_numeric(df[column].iloc[positions], errors='coerce').to_numpy(dtype='float64')
+    return positions[select_k(values, k, largest)]
+
+# 计算前K名或后K名
+def rank_frame(df, k=DEFAULT_K, column=DEFAULT_COLUMN, largest=True, month=None, grade=None, fingerprint=None):
+    """返回df中column最大（largest=False时为最小）的k行，按排名排列，保留原有的全部列
+
+    month、grade不为None时只在该月份（需要有月份列）或该年级（'2023'或'23'）的班级中排名。
+    按(数据指纹, 排名列, K)缓存排名行的位置（同时区分排名方向和筛选条件），每次从当前的df中取出对应的行；
+    fingerprint为None时按df中参与排名的列计算指纹（见dataset_registry.fingerprint）。
+    """
+    grade = normalize_grade(grade)
+    if fingerprint is None:
+        used = [col for col in ['班级', '月份', column] if col in df.columns]
+        fingerprint = dataset_registry.fingerprint(df[used])
+    key = (fingerprint, column, int(k), largest, month, grade)
+    return df.iloc[_cached(key, lambda: _rank_positions(df, k, column, largest, month, grade))]
+
+# 前K名
+def top_k(df, k=DEFAULT_K, column=DEFAULT_COLUMN, month=None, grade=None, fingerprint=None):
+    """返回column最大的k行"""
+    return rank_frame(df, k, column, True, month, grade, fingerprint)
+
+# 后K名
+def bottom_k(df, k=DEFAULT_K, column=DEFAULT_COLUMN, month=None, grade=None, fingerprint=None):
+    """返回column最小的k行"""
+    return rank_frame(df, k, column, False, month, grade, fingerprint)
+
+# 在数据库中的所有月份（或一个月份）中排名
+def rank_store(k=DEFAULT_K, column=DEFAULT_COLUMN, largest=True, month=None, grade=None, data_dir=data_store.DEFAULT_DATA_DIR):
+    """在数据库中仍有数据文件的所有月份（month不为None时只在该月份）的班级记录中排名，返回班级、月份和排名列
+
+    以数据库内容指纹和参与排名的月份为键缓存，命中缓存时不读取数据；未命中时只从数据库中读取班级和排名列。
+    """
+    grade = normalize_grade(grade)
+    months = [m for m in data_store.source_months(data_dir) if month is None or m == month]
+    key = ('store', data_store.dataset_fingerprint(data_dir), tuple(months), column, int(k), largest, grade)
+
+    def compute():
+        df = data_store.load_months(months, data_dir=data_dir, columns=['班级', column])
+        if df.empty or column not in df.columns:
+            return pd.DataFrame(columns=['班级', column, '月份'])
+        return df.iloc[_rank_positions(df, k, column, largest, None, grade)].reset_index(drop=True)
+
+    return _cached(key, compute)
+
+# 清空排名缓存
+def clear_cache():
+    """清空进程内的排名结果缓存"""
+    with _cache_lock:
+        _cache.clear()
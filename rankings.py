@@ -1,112 +1,128 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+import analytics
+import data_store
+import deduction_analysis
+import html_table
+import ranking_service
+import sidebar
+import suggestion_engine
+
+# 数据源选项（"全部月份"在数据库中导入的所有月份的班级记录中排名）
+DATA_SOURCES = ["原始数据", "清洗后数据", "填充后数据", "全部月份"]
+
+# 月份和年级选择中表示不筛选的选项
+ALL_OPTION = "全部"
 
 # 生成改进建议的函数
 def generate_improvement_suggestions(deductions):
-    """根据扣分项生成改进建议"""
-    suggestions = []
-    
-    # 根据扣分项生成针对性建议
-    if '手机管理' in deductions:
-        suggestions.append("加强手机管理教育，制定明确的手机使用规定，严格执行课堂手机收纳制度")
-    
-    if '发型发饰' in deductions:
-        suggestions.append("加强学生仪容仪表教育，明确发型发饰规范要求，定期检查")
-    
-    if '校服衣着' in deductions:
-        suggestions.append("强化校服穿着规范，建立每日检查制度，对不符合要求的学生及时纠正")
-    
-    if '两操' in deductions:
-        suggestions.append("提高早操和课间操质量，安排专人负责监督，定期开展评比活动")
-    
-    if '违规违纪' in deductions:
-        suggestions.append("加强纪律教育，明确校规校纪，建立违纪行为记录和改进跟踪机制")
-    
-    if '男生寝室卫生' in deductions:
-        suggestions.append("加强男生寝室卫生管理，制定卫生标准，定期检查评比，建立奖惩机制")
-    
-    if '女生寝室卫生' in deductions:
-        suggestions.append("加强女生寝室卫生管理，制定卫生标准，定期检查评比，建立奖惩机制")
-    
-    if '教室卫生' in deductions:
-        suggestions.append("建立教室卫生责任制，安排值日表，定期检查，保持教室环境整洁")
-    
-    if '教室规范' in deductions:
-        suggestions.append("加强教室规范管理，包括桌椅摆放、墙面装饰、学习氛围等，创造良好学习环境")
-    
-    if '班主任考勤' in deductions:
-        suggestions.append("班主任应加强考勤管理，确保按时到岗，做好班级日常管理工作")
-    
-    # 通用建议
-    if len(deductions) > 3:
-        suggestions.append("建议召开班级专题会议，全面分析问题，制定整体改进计划")
-    
-    suggestions.append("建立班级内部激励机制，鼓励学生自觉遵守各项规定")
-    suggestions.append("加强与家长的沟通合作，共同促进学生全面发展")
-    
-    return suggestions
+    """根据扣分项生成改进建议（规则见suggestion_rules.json）
 
-# 查看前5名功能
-def view_top5():
-    """实现查看前5名班级功能"""
-    st.markdown('<h2 class="section-header">🏆 查看前5名</h2>', unsafe_allow_html=True)
-    
+    deductions可以是{考核项目: 扣分}，也可以是考核项目名称的列表。
+    """
+    return suggestion_engine.suggestions_for(deductions)
+
+# 选择数据源和排名条件并计算排名
+def _ranked_classes(largest, full_rows=False):
+    """显示数据源、排名列、名次数、月份和年级选择，返回(排名结果, 排名列, K)；数据不可用时返回None
+
+    排名由ranking_service按部分选择计算并缓存；full_rows为True时排名结果包含对应行的全部列，
+    否则原始数据和数据库中只读取班级和排名列。
+    """
     # 选择数据源
     data_source = st.selectbox(
         "选择数据源",
-        ["原始数据", "清洗后数据", "填充后数据"]
+        DATA_SOURCES
     )
     
-    if data_source == "原始数据" and st.session_state.raw_data is not None:
-        df = st.session_state.raw_data
-    elif data_source == "清洗后数据" and st.session_state.cleaned_data is not None:
-        df = st.session_state.cleaned_data
-    elif data_source == "填充后数据" and 'filled_data' in st.session_state and st.session_state.filled_data is not None:
-        df = st.session_state.filled_data
+    if data_source == "全部月份":
+        months = data_store.source_months()
+        if not months:
+            st.warning("数据库中还没有导入任何月份的数据，请先导入数据")
+            return None
+        columns = list(dict.fromkeys(col for month in months for col in data_store.month_columns(month)))
+        classes = data_store.list_classes(months)
+    elif data_source == "原始数据":
+        columns = sidebar.get_raw_columns()
+    elif data_source == "清洗后数据":
+        df = sidebar.get_dataset('cleaned_data')
+        columns = [] if df is None else list(df.columns)
     else:
+        df = sidebar.get_dataset('filled_data')
+        columns = [] if df is None else list(df.columns)
+    
+    if not columns:
         st.warning("请先导入数据或完成相应的数据处理步骤")
-        return
+        return None
+    
+    # 排名条件
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        column = st.selectbox("排名项目", ranking_service.ranking_columns(columns))
+    with col2:
+        k = st.number_input("名次数", min_value=1, max_value=100, value=ranking_service.DEFAULT_K, step=1)
+    
+    if data_source == "全部月份":
+        with col3:
+            month = st.selectbox("月份", [ALL_OPTION] + months)
+        month = None if month == ALL_OPTION else month
+    else:
+        # 单个文件的数据（只需要班级和排名列时，原始数据尚未完整加载则只从列式缓存中读取这两列）
+        if data_source == "原始数据":
+            df = sidebar.get_raw_data(None if full_rows else ['班级', column])
+        if df is None or '班级' not in df.columns:
+            st.warning("数据中没有找到'班级'列")
+            return None
+        classes = df['班级']
+        month = None
+    
+    with col4:
+        grade = st.selectbox("年级", [ALL_OPTION] + ranking_service.list_grades(classes))
+    grade = None if grade == ALL_OPTION else grade
+    
+    if data_source == "全部月份":
+        # full_rows为True时只读取排名结果所在月份的完整数据，按班级和月份取回对应的行
+        ranked = analytics.rank_months(k, column, largest, month, grade, full_rows=full_rows)
+    else:
+        ranked = analytics.rank(df, k, column, largest, grade=grade)
+    
+    if ranked.empty:
+        st.warning("没有符合条件的班级")
+        return None
+    return ranked, column, int(k)
+
+# 排名结果中的班级标签（全部月份中同一班级可能出现多次，标注月份）
+def _class_labels(ranked):
+    if '月份' in ranked.columns:
+        return ranked['班级'].astype(str) + '（' + ranked['月份'].astype(str) + '）'
+    return ranked['班级'].astype(str)
+
+# 查看前5名功能
+def view_top5():
+    """实现查看前5名班级功能（可选择名次数、排名项目、月份和年级）"""
+    st.markdown('<h2 class="section-header">🏆 查看前5名</h2>', unsafe_allow_html=True)
     
-    # 获取前5名
-    top5 = df.nlargest(5, '实际班级总分')[['班级', '实际班级总分']]
+    result = _ranked_classes(largest=True)
+    if result is None:
+        return
+    top, column, k = result
+    top = top.assign(班级=_class_labels(top))
    
-    # 显示前5名表格
-    st.markdown('<div class="subsection-header-with-icon">🏆 前5名班级</div>', unsafe_allow_html=True)
-    
-    # 重置索引并命名为序号，从1开始
-    display_top5 = top5.copy()
-    display_top5.index = range(1, len(display_top5) + 1)
-    display_top5.index.name = "序号"
-    
-    # 使用HTML生成居中对齐的表格
-    html_table = f"""
-    <table style="width: 100%; border-collapse: collapse; text-align: center;">
-        <thead>
-            <tr style="background-color: #f0f2f6;">
-                <th style="padding: 8px; border: 1px solid #ddd;">序号</th>
-                {''.join([f'<th style="padding: 8px; border: 1px solid #ddd;">{col}</th>' for col in display_top5.columns])}
-            </tr>
-        </thead>
-        <tbody>
-            {''.join([
-                '<tr>' + f'<td style="padding: 8px; border: 1px solid #ddd;">{index}</td>' + ''.join([f'<td style="padding: 8px; border: 1px solid #ddd;">{val}</td>' for val in row]) + '</tr>'
-                for index, row in display_top5.iterrows()
-            ])}
-        </tbody>
-    </table>
-    """
-    st.markdown(html_table, unsafe_allow_html=True)
+    # 显示前K名表格
+    st.markdown(f'<div class="subsection-header-with-icon">🏆 前{k}名班级</div>', unsafe_allow_html=True)
     
-    # 创建前5名柱状图
-    st.markdown('<div class="subsection-header-with-icon">📊 前5名班级总分对比</div>', unsafe_allow_html=True)
+    # 使用HTML生成居中对齐的表格，第一列为从1开始的序号
+    html_table.render_html_table(top[['班级', column]])
+    
+    # 创建前K名柱状图
+    st.markdown(f'<div class="subsection-header-with-icon">📊 前{k}名班级{column}对比</div>', unsafe_allow_html=True)
     
     fig = px.bar(
-        top5,
+        top,
         x='班级',
-        y='实际班级总分',
-        labels={'实际班级总分': '实际总分', '班级': '班级名称'},
-        color='实际班级总分',
+        y=column,
+        labels={column: column, '班级': '班级名称'},
+        color=column,
         color_continuous_scale='Viridis'
     )
     
@@ -125,7 +141,7 @@ def view_top5():
     
     # 排行榜样式展示
     st.markdown('<div class="subsection-header-with-icon">📋 排行榜</div>', unsafe_allow_html=True)
-    for i, (idx, row) in enumerate(top5.iterrows()):
+    for i, (idx, row) in enumerate(top.iterrows()):
         rank = i + 1
         medal = "🥇" if rank == 1 else "🥈" if rank == 2 else "🥉" if rank == 3 else f"第{rank}名"
         st.markdown(f'<div class="subsection-header">{medal} {row["班级"]}</div>', unsafe_allow_html=True)
@@ -133,69 +149,36 @@ def view_top5():
         with col1:
             st.metric("排名", rank)
         with col2:
-            st.metric("总分", f"{row['实际班级总分']:.2f}")
+            st.metric(column, f"{row[column]:.2f}")
         st.write("---")
 
 # 查看后5名功能
 def view_bottom5():
-    """实现查看后5名班级功能"""
+    """实现查看后5名班级功能（可选择名次数、排名项目、月份和年级）"""
     st.markdown('<h2 class="section-header">📉 查看后5名</h2>', unsafe_allow_html=True)
     
-    # 选择数据源
-    data_source = st.selectbox(
-        "选择数据源",
-        ["原始数据", "清洗后数据", "填充后数据"]
-    )
-    
-    if data_source == "原始数据" and st.session_state.raw_data is not None:
-        df = st.session_state.raw_data
-    elif data_source == "清洗后数据" and st.session_state.cleaned_data is not None:
-        df = st.session_state.cleaned_data
-    elif data_source == "填充后数据" and 'filled_data' in st.session_state and st.session_state.filled_data is not None:
-        df = st.session_state.filled_data
-    else:
-        st.warning("请先导入数据或完成相应的数据处理步骤")
+    # 扣分项分析需要排名班级的全部考核项目
+    result = _ranked_classes(largest=False, full_rows=True)
+    if result is None:
         return
+    ranked, column, k = result
+    bottom5 = ranked.assign(班级=_class_labels(ranked))
     
-    # 获取后5名
-    bottom5 = df.nsmallest(5, '实际班级总分')
-    
-    # 显示后5名表格
-    st.markdown('<div class="subsection-header-with-icon">📉 后5名班级</div>', unsafe_allow_html=True)
-    
-    # 重置索引并命名为序号，从1开始
-    display_bottom5 = bottom5[['班级', '实际班级总分']].copy()
-    display_bottom5.index = range(1, len(display_bottom5) + 1)
-    display_bottom5.index.name = "序号"
-    
-    # 使用HTML生成居中对齐的表格
-    html_table = f"""
-    <table style="width: 100%; border-collapse: collapse; text-align: center;">
-        <thead>
-            <tr style="background-color: #f0f2f6;">
-                <th style="padding: 8px; border: 1px solid #ddd;">序号</th>
-                {''.join([f'<th style="padding: 8px; border: 1px solid #ddd;">{col}</th>' for col in display_bottom5.columns])}
-            </tr>
-        </thead>
-        <tbody>
-            {''.join([
-                '<tr>' + f'<td style="padding: 8px; border: 1px solid #ddd;">{index}</td>' + ''.join([f'<td style="padding: 8px; border: 1px solid #ddd;">{val}</td>' for val in row]) + '</tr>'
-                for index, row in display_bottom5.iterrows()
-            ])}
-        </tbody>
-    </table>
-    """
-    st.markdown(html_table, unsafe_allow_html=True)
+    # 显示后K名表格
+    st.markdown(f'<div class="subsection-header-with-icon">📉 后{k}名班级</div>', unsafe_allow_html=True)
     
-    # 创建后5名柱状图
-    st.markdown('<div class="subsection-header-with-icon">📊 后5名班级总分对比</div>', unsafe_allow_html=True)
+    # 使用HTML生成居中对齐的表格，第一列为从1开始的序号
+    html_table.render_html_table(bottom5[['班级', column]])
+    
+    # 创建后K名柱状图
+    st.markdown(f'<div class="subsection-header-with-icon">📊 后{k}名班级{column}对比</div>', unsafe_allow_html=True)
     
     fig = px.bar(
         bottom5,
         x='班级',
-        y='实际班级总分',
-        labels={'实际班级总分': '实际总分', '班级': '班级名称'},
-        color='实际班级总分',
+        y=column,
+        labels={column: column, '班级': '班级名称'},
+        color=column,
         color_continuous_scale='Plasma'  # 使用不同的颜色方案区分前5名
     )
     
@@ -215,37 +198,42 @@ def view_bottom5():
     # 分析主要扣分项
     st.markdown('<div class="subsection-header-with-icon">⚠️ 主要扣分项分析</div>', unsafe_allow_html=True)
     
-    # 获取评分项目列（排除班级、编号、总分等非评分项）
-    scoring_columns = [col for col in df.columns if col not in ['编号', '班级', '班级教室', '初始分数', '实际班级总分']]
+    # 对所有后K名班级的考核项目矩阵一次性找出主要扣分项（前3个）
+    top_deductions = analytics.deductions(ranked)
+    grouped = dict(tuple(top_deductions.groupby(level=0, sort=False)))
+    
+    # 对所有后K名班级一次性应用改进建议规则
+    suggestions = suggestion_engine.suggestions_table(ranked)
+    grouped_suggestions = suggestions.groupby(level=0, sort=False)['改进建议'].agg(list)
     
-    # 为每个后5名班级分析扣分项
-    for i, (idx, row) in enumerate(bottom5.iterrows()):
+    for idx, row in bottom5.iterrows():
         with st.expander(f"📉 {row['班级']} - 扣分项分析"):
             col1, col2 = st.columns([1, 2])
             
             with col1:
-                st.metric("总分", f"{row['实际班级总分']:.2f}")
+                st.metric(column, f"{row[column]:.2f}")
             
             with col2:
-                # 获取扣分项（负值）
-                deductions = {}
-                for col in scoring_columns:
-                    if pd.notna(row[col]) and row[col] < 0:
-                        deductions[col] = row[col]
-                
-                if deductions:
-                    # 按扣分从多到少排序
-                    sorted_deductions = sorted(deductions.items(), key=lambda x: x[1])
+                if idx in grouped:
+                    # 按扣分从多到少排列的主要扣分项
                     st.write("**主要扣分项：**")
-                    for item in sorted_deductions[:3]:  # 只显示前3个主要扣分项
-                        st.write(f"- {item[0]}: {item[1]:.2f}")
+                    st.markdown("\n".join(f"- {item}: {value:.2f}" for item, value in zip(grouped[idx]['考核项目'], grouped[idx]['扣分'])))
                     
-                    # 生成改进建议
-                    suggestions = generate_improvement_suggestions(deductions.keys())
+                    # 改进建议
+                    class_suggestions = grouped_suggestions.get(idx, [])
                     
-                    if suggestions:
+                    if class_suggestions:
                         st.write("\n**改进建议：**")
-                        for suggestion in suggestions[:3]:  # 只显示前3个建议
+                        for suggestion in class_suggestions[:3]:  # 只显示前3个建议
                             st.write(f"- {suggestion}")
                 else:
-                    st.write("**没有明显扣分项**")
\ No newline at end of file
+                    st.write("**没有明显扣分项**")
+    
+    # 导出主要扣分项明细
+    if not top_deductions.empty:
+        st.download_button(
+            "📥 导出主要扣分项明细（CSV）",
+            deduction_analysis.deductions_csv(top_deductions),
+            file_name=f"后{k}名班级主要扣分项.csv",
+            mime="text/csv"
+        )
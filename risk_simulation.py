@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+# 默认模拟次数、随机种子（固定种子保证结果可复现）和关注的后N名
+DEFAULT_DRAWS = 10000
+DEFAULT_SEED = 42
+DEFAULT_BOTTOM_N = 5
+
+# 每批模拟的次数（控制内存占用：班级数×每批次数）
+DRAW_BATCH_SIZE = 10000
+
+# 计算每个班级相邻有效月份之间的总分变化
+def month_deltas(matrix):
+    """返回班级×月份的变化矩阵：每个有效月份与该班级上一个有效月份的差值，其余位置为NaN"""
+    values = matrix.to_numpy(dtype='float64')
+    previous = pd.DataFrame(values).ffill(axis=1).shift(1, axis=1).to_numpy()
+    return values - previous
+
+# 模拟下个月的总分
+def simulate_next_month(matrix, draws=DEFAULT_DRAWS, seed=DEFAULT_SEED, bottom_n=DEFAULT_BOTTOM_N, threshold=None, batch_size=DRAW_BATCH_SIZE):
+    """对每个班级的历史月度变化做自助抽样（有放回），模拟下个月的总分，返回每个班级跌入后bottom_n名和低于阈值的概率
+
+    每次模拟中所有班级同时抽样，一批模拟为一个班级×次数的数组，后N名用argpartition按列选出，
+    计算量与模拟次数×班级数成正比。没有历史变化（只有一个月数据）的班级从所有班级的变化中抽样；
+    没有任何数据的班级不参与模拟。
+    """
+    values = matrix.to_numpy(dtype='float64')
+    valid = ~np.isnan(values)
+    has_data = valid.any(axis=1)
+    values, index = values[has_data], matrix.index[has_data]
+    columns = ['当前总分', '预期总分', f'跌入后{bottom_n}名概率', '低于阈值概率']
+    if len(values) == 0:
+        return pd.DataFrame(columns=columns, index=index)
+
+    # 当前总分为每个班级最后一个有效月份的总分
+    last = values[np.arange(len(values)), values.shape[1] - 1 - (~np.isnan(values))[:, ::-1].argmax(axis=1)]
+
+    # 把每个班级的有效变化排到前面，便于按下标抽样
+    deltas = month_deltas(pd.DataFrame(values))
+    counts = (~np.isnan(deltas)).sum(axis=1)
+    packed = np.take_along_axis(deltas, np.argsort(np.isnan(deltas), axis=1, kind='stable'), axis=1)
+    pooled = deltas[~np.isnan(deltas)]
+    if len(pooled) == 0:
+        pooled = np.zeros(1)
+
+    rng = np.random.default_rng(seed)
+    # 班级数少于bottom_n时所有班级都在后bottom_n名中（结果列名仍按所请求的bottom_n）
+    selected = min(bottom_n, len(values))
+    bottom_hits = np.zeros(len(values))
+    below_hits = np.zeros(len(values))
+    total = np.zeros(len(values))
+    for start in range(0, draws, batch_size):
+        size = min(batch_size, draws - start)
+        uniform = rng.random((len(values), size))
+        sampled = np.take_along_axis(packed, (uniform * np.maximum(counts, 1)[:, None]).astype(np.int64), axis=1) if packed.shape[1] else np.zeros((len(values), size))
+        no_history = counts == 0
+        if no_history.any():
+            sampled[no_history] = pooled[(uniform[no_history] * len(pooled)).astype(np.int64)]
+        simulated = last[:, None] + sampled
+
+        total += simulated.sum(axis=1)
+        if threshold is not None:
+            below_hits += (simulated < threshold).sum(axis=1)
+        if selected > 0:
+            # 每次模拟（每列）中总分最低的bottom_n个班级
+            bottom = np.argpartition(simulated, selected - 1, axis=0)[:selected]
+            bottom_hits += np.bincount(bottom.ravel(), minlength=len(values))
+
+    return pd.DataFrame({
+        '当前总分': last,
+        '预期总分': total / draws,
+        f'跌入后{bottom_n}名概率': bottom_hits / draws,
+        '低于阈值概率': below_hits / draws if threshold is not None else np.nan
+    }, index=index, columns=columns)
@@ -1,16 +1,106 @@
 import streamlit as st
+import os
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import data_cache
+import dataset_registry
+
+# 数据文件目录
+DATA_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'data')
 
 # 初始化会话状态
 def init_session_state():
     """初始化所有需要的会话状态变量"""
-    if 'raw_data' not in st.session_state:
-        st.session_state.raw_data = None
-    if 'cleaned_data' not in st.session_state:
-        st.session_state.cleaned_data = None
+    if 'datasets' not in st.session_state:
+        # 会话只保存原始、清洗后、填充后数据在进程内数据集登记表中的指纹，数据本身由所有会话共用
+        st.session_state.datasets = {}
     if 'current_file' not in st.session_state:
         st.session_state.current_file = None
-    if 'filled_data' not in st.session_state:
-        st.session_state.filled_data = None
+    if 'preview_data' not in st.session_state:
+        st.session_state.preview_data = None
+    if 'processed_uploads' not in st.session_state:
+        st.session_state.processed_uploads = set()
+    if 'upload_summary' not in st.session_state:
+        st.session_state.upload_summary = None
+    if 'improvement_export' not in st.session_state:
+        # 已生成改进建议表的导出范围（点击生成后才读取数据，页面刷新时不再重复计算）
+        st.session_state.improvement_export = None
+
+# 当前会话的ID（用于登记数据集的引用）
+def session_id():
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else 'local'
+
+# 会话是否仍然存在
+def _session_alive(owner):
+    return not runtime.exists() or runtime.get_instance().is_active_session(owner)
+
+# 获取会话中的数据集（raw_data、cleaned_data或filled_data）
+def get_dataset(name):
+    """返回会话引用的数据集（只读，需要修改时先复制），没有时返回None"""
+    key = st.session_state.datasets.get(name)
+    if key is None:
+        return None
+    df = dataset_registry.get(key)
+    if df is None:
+        st.session_state.datasets.pop(name)
+    return df
+
+# 获取会话中数据集的指纹
+def dataset_key(name):
+    """返回会话引用的数据集的指纹，没有或已被淘汰时返回None"""
+    return st.session_state.datasets.get(name) if get_dataset(name) is not None else None
+
+# 让会话引用已登记的数据集
+def set_dataset_key(name, key):
+    """会话改为引用指纹为key的数据集（已登记在数据集登记表中）；key为None时清除"""
+    owner = session_id()
+    old_key = st.session_state.datasets.pop(name, None)
+    if key is not None and dataset_registry.retain(key, owner):
+        st.session_state.datasets[name] = key
+    if old_key is not None and old_key not in st.session_state.datasets.values():
+        dataset_registry.release(old_key, owner)
+
+# 设置会话中的数据集
+def set_dataset(name, df):
+    """把数据集登记到进程内的数据集登记表，会话只保存其指纹；df为None时清除"""
+    key = None
+    if df is not None:
+        # 先释放已关闭会话的引用，便于淘汰不再使用的数据集
+        dataset_registry.prune(_session_alive)
+        key = dataset_registry.register(df, session_id())
+    set_dataset_key(name, key)
+
+# 获取原始数据（读取数据时只做快速预览，完整数据在分析页面首次需要时才加载）
+def get_raw_data(columns=None):
+    """返回当前文件的原始数据，尚未加载时通过列式缓存读取；指定columns时只返回所需的列"""
+    raw_data = get_dataset('raw_data')
+    if raw_data is None and st.session_state.current_file is not None:
+        file_path = os.path.join(DATA_DIR, st.session_state.current_file)
+        if columns is not None and os.path.exists(file_path):
+            # 只需要部分列时直接从列式缓存中读取这些列，不加载完整数据
+            return data_cache.read_data_file(file_path, columns)
+        if os.path.exists(file_path):
+            df = data_cache.read_data_file(file_path)
+            # 删除所有Unnamed:开头的列（空列）
+            set_dataset('raw_data', df.loc[:, ~df.columns.str.contains('^Unnamed:')])
+            raw_data = get_dataset('raw_data')
+    if columns is not None and raw_data is not None:
+        return raw_data[[col for col in raw_data.columns if col in columns]]
+    return raw_data
+
+# 获取原始数据的列名（原始数据尚未加载时只读取文件的第一行）
+def get_raw_columns():
+    """返回当前文件原始数据的列名（不含Unnamed:开头的空列），没有当前文件时返回空列表"""
+    raw_data = get_dataset('raw_data')
+    if raw_data is not None:
+        return list(raw_data.columns)
+    if st.session_state.current_file is None:
+        return []
+    file_path = os.path.join(DATA_DIR, st.session_state.current_file)
+    if not os.path.exists(file_path):
+        return []
+    return [col for col in data_cache.peek_data_file(file_path, nrows=1).columns if not str(col).startswith('Unnamed:')]
 
 # 渲染侧边栏导航
 def render_sidebar():
@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+from collections.abc import Mapping
+import numpy as np
+import pandas as pd
+import deduction_analysis
+
+# 改进建议规则配置文件
+RULES_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'suggestion_rules.json')
+
+# 已读取的规则（进程内共享）：配置文件路径 -> {'mtime_ns': 修改时间, 'rules': 规则}
+_rules_cache = {}
+_rules_lock = threading.Lock()
+
+# 读取改进建议规则
+def load_rules(path=RULES_PATH):
+    """读取改进建议规则配置，配置文件修改后自动重新读取
+
+    返回字典：rules为规则表（考核项目、阈值、建议，按配置顺序排列），考核项目扣分达到阈值（绝对值，
+    0表示有扣分即触发）时给出该建议；many_deductions为扣分项数量达到min_items时的建议；
+    general为每个班级都给出的通用建议。
+    """
+    path = os.path.abspath(path)
+    mtime_ns = os.stat(path).st_mtime_ns
+    with _rules_lock:
+        cached = _rules_cache.get(path)
+        if cached is not None and cached['mtime_ns'] == mtime_ns:
+            return cached['rules']
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    rules = {
+        'rules': pd.DataFrame({
+            '考核项目': [rule['item'] for rule in config.get('rules', [])],
+            '阈值': np.array([rule.get('threshold', 0) for rule in config.get('rules', [])], dtype='float64'),
+            '建议': [rule['suggestion'] for rule in config.get('rules', [])]
+        }),
+        'many_deductions': config.get('many_deductions'),
+        'general': list(config.get('general', []))
+    }
+    with _rules_lock:
+        _rules_cache[path] = {'mtime_ns': mtime_ns, 'rules': rules}
+    return rules
+
+# 规则覆盖的考核项目
+def supported_items(rules=None):
+    """返回规则中有针对性建议的考核项目（按配置顺序，不重复）"""
+    rules = load_rules() if rules is None else rules
+    return list(dict.fromkeys(rules['rules']['考核项目']))
+
+# 对扣分矩阵一次性应用所有规则
+def suggestion_matrix(deductions, rules=None):
+    """对班级×考核项目扣分矩阵一次性计算每个班级触发的建议
+
+    deductions为deduction_analysis.deduction_matrix的结果（负值为扣分），也可以是表示是否扣分的布尔矩阵
+    （此时不知道扣分多少，只触发阈值为0的规则）。返回(触发矩阵, 建议文本)：触发矩阵为班级×建议的布尔数组，
+    列依次为各条规则、扣分项较多时的建议和通用建议，与建议文本一一对应。
+    """
+    rules = load_rules() if rules is None else rules
+    table = rules['rules']
+    thresholds = table['阈值'].to_numpy()
+    if len(deductions.columns) and all(pd.api.types.is_bool_dtype(dtype) for dtype in deductions.dtypes):
+        flags = deductions.to_numpy(dtype=bool)
+        fired = deductions.reindex(columns=table['考核项目'], fill_value=False).to_numpy(dtype=bool) & (thresholds <= 0)
+    else:
+        flags = deductions.to_numpy(dtype='float64', na_value=np.nan) < 0
+        values = deductions.reindex(columns=table['考核项目']).to_numpy(dtype='float64', na_value=np.nan)
+        fired = (values < 0) & (-values >= thresholds)
+
+    parts = [fired]
+    texts = list(table['建议'])
+    many = rules.get('many_deductions')
+    if many:
+        parts.append((flags.sum(axis=1) >= many.get('min_items', 1))[:, None])
+        texts.append(many['suggestion'])
+    parts.append(np.ones((len(deductions), len(rules['general'])), dtype=bool))
+    texts += rules['general']
+    return np.hstack(parts), np.asarray(texts, dtype=object)
+
+# 单个班级的改进建议
+def suggestions_for(deductions, rules=None):
+    """根据一个班级的扣分项生成改进建议：deductions为{考核项目: 扣分}，或只有考核项目名称的列表（只触发阈值为0的规则）"""
+    if isinstance(deductions, Mapping):
+        matrix = pd.DataFrame([dict(deductions)], dtype='float64')
+    else:
+        matrix = pd.DataFrame([[True] * len(list(deductions))], columns=list(deductions), dtype=bool)
+    fired, texts = suggestion_matrix(matrix, rules)
+    return list(texts[fired[0]])
+
+# 所有班级的改进建议
+def suggestions_table(df, rules=None):
+    """对df中的所有班级（可以包含多个月份）一次性生成改进建议，返回整理好的长表
+
+    每个班级的每条建议一行，包含班级、月份（df中有月份列时）、序号、改进建议列，索引为该班级在df中的行索引。
+    """
+    fired, texts = suggestion_matrix(deduction_analysis.deduction_matrix(df), rules)
+    rows, cols = np.nonzero(fired)
+    id_columns = [col for col in ['班级', '月份'] if col in df.columns]
+    result = df[id_columns].iloc[rows].copy()
+    starts = np.searchsorted(rows, rows)
+    result['序号'] = np.arange(len(rows)) - starts + 1
+    result['改进建议'] = texts[cols]
+    return result
+
+# 全校改进建议表
+def improvement_sheet(df, rules=None):
+    """生成每个班级（每个月份）一行的改进建议表，包含月份、班级、实际班级总分、主要扣分项和改进建议，用于批量导出打印"""
+    id_columns = [col for col in ['月份', '班级', '实际班级总分'] if col in df.columns]
+    sheet = df[id_columns].copy()
+    if '月份' in sheet.columns:
+        sheet['月份'] = sheet['月份'].astype(str)
+
+    top = deduction_analysis.top_deductions(df)
+    labels = top['考核项目'].astype(str) + '（' + top['扣分'].map('{:.2f}'.format) + '）'
+    sheet['主要扣分项'] = labels.groupby(level=0, sort=False).agg('、'.join).reindex(sheet.index).fillna('无')
+
+    suggestions = suggestions_table(df, rules)
+    numbered = suggestions['序号'].astype(str) + '. ' + suggestions['改进建议']
+    sheet['改进建议'] = numbered.groupby(level=0, sort=False).agg('\n'.join).reindex(sheet.index).fillna('')
+    return sheet
+
+# 导出改进建议
+def sheet_csv(sheet):
+    """把改进建议表转换为CSV（带BOM，便于用Excel直接打开）"""
+    return sheet.to_csv(index=False).encode('utf-8-sig')
@@ -3,33 +3,33 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import numpy as np
-import os
+import analytics
+import data_cache
+import data_catalog
+import data_store
+import fill_engine
+import forecasting
+import html_table
+import risk_simulation
+
+# 不填充缺失月份（趋势和预测中跳过缺失的月份）
+NO_FILL = 'none'
+NO_FILL_LABEL = '不填充（跳过缺失月份）'
 
 # 变化趋势和风险预测功能
 def trend_analysis():
     """实现变化趋势和风险预测功能"""
     st.markdown('<h2 class="section-header">📈 变化趋势和风险预测</h2>', unsafe_allow_html=True)
     
-    # 获取data目录下的Excel文件
-    excel_files = [f for f in os.listdir('data') if f.endswith('.xlsx')]
+    # 获取data目录下的Excel文件（文件目录已按月份排序）
+    excel_files = data_catalog.list_files(extensions=('.xlsx',))
     
     if not excel_files:
         st.warning("当前目录下没有找到Excel文件，请先导入数据")
         return
     
-    # 定义月份顺序
-    month_order = ['1月', '2月', '3月', '4月', '5月', '6月', '7月', '8月', '9月', '10月', '11月', '12月']
-    
-    # 提取月份信息并按顺序排序文件
-    def get_month(file_name):
-        return file_name.replace('.xlsx', '')
-    
-    # 过滤有效的月份文件
-    valid_files = [f for f in excel_files if get_month(f) in month_order]
-    
-    # 按月份顺序排序文件
-    sorted_files = sorted(valid_files, key=lambda x: month_order.index(get_month(x)))
+    # 文件名为有效月份的文件
+    sorted_files = [entry['name'] for entry in data_catalog.month_files()]
     
     # 选择最近的3个月（默认）
     default_files = sorted_files[-3:] if len(sorted_files) >= 3 else sorted_files
@@ -52,92 +52,74 @@ def trend_analysis():
     # 读取并合并数据
     st.markdown('<div class="subsection-header-with-icon">📥 数据加载与合并</div>', unsafe_allow_html=True)
     
-    all_data = []
-    for file in selected_files:
-        try:
-            df = pd.read_excel(f"data/{file}")
-            # 提取月份信息（从文件名中获取，假设文件名格式为"9月.xlsx"）
-            month = file.replace('.xlsx', '')
-            df['月份'] = month
-            all_data.append(df)
-            st.success(f"成功加载 {file}")
-        except Exception as e:
-            st.error(f"加载 {file} 时出错: {str(e)}")
-            continue
+    # 同步所选文件到数据库（只重新导入有变化的文件，多个文件在进程池中并发解析），再按月份从数据库读取合并后的数据
+    progress_bar = st.progress(0.0, text="正在加载数据文件...")
+    
+    def update_progress(done, total, result):
+        progress_bar.progress(done / total, text=f"正在加载数据文件（{done}/{total}）：{result['file']}")
+    
+    results = data_store.sync_files([data_catalog.find_file(file)['path'] for file in selected_files], on_progress=update_progress)
+    progress_bar.empty()
+    
+    loaded_months = []
+    for result in results:
+        if result['status'] == 'error':
+            st.error(f"加载 {result['file']} 时出错: {result['message']}")
+        else:
+            # 月份信息从文件名中获取，假设文件名格式为"9月.xlsx"
+            loaded_months.append(result['month'])
+            st.success(f"成功加载 {result['file']}")
     
-    if not all_data:
+    if not loaded_months:
         st.error("无法加载任何文件，请检查文件格式")
         return
     
     # 合并数据
-    combined_df = pd.concat(all_data, ignore_index=True)
+    combined_df = data_store.load_months(loaded_months)
     st.write(f"合并后数据形状: {combined_df.shape}")
+    st.caption(f"合并后数据内存占用: {data_cache.describe_memory(combined_df)}")
+    
+    # 班级缺少某些月份的数据时总分的处理方式（默认跳过缺失的月份，不按0处理）
+    fill_strategy = st.selectbox(
+        "缺失月份的总分处理",
+        [NO_FILL] + list(fill_engine.FILL_STRATEGIES),
+        format_func=lambda name: NO_FILL_LABEL if name == NO_FILL else fill_engine.FILL_STRATEGIES[name],
+        key="trend_fill_strategy"
+    )
     
     # 数据预览
     st.markdown('<div class="subsection-header-with-icon">👀 合并后数据预览</div>', unsafe_allow_html=True)
     
     # 查找总分列（支持不同名称）
-    total_score_col = None
-    for col in combined_df.columns:
-        if '实际班级总分' in col or '总分' in col:
-            total_score_col = col
-            break
+    total_score_col = analytics.total_score_column(combined_df.columns)
+    
+    # 填充缺失月份的总分：先为缺少某些月份的班级补上空行，再在已加载的数据上按班级分组计算（不重新读取文件）
+    if fill_strategy != NO_FILL and total_score_col and '班级' in combined_df.columns and '月份' in combined_df.columns:
+        combined_df = fill_engine.fill_missing(combined_df, fill_strategy, columns=[total_score_col], complete=True)
+    
+    # 班级×月份总分矩阵（只透视一次，横向预览、风险预测和风险趋势图共用）
+    score_matrix = None
     
     if total_score_col:
         # 使用透视表横向展示各月份总分
         try:
-            # 创建透视表，按班级和月份展示总分
-            pivot_df = combined_df.pivot_table(
-                index='班级', 
-                columns='月份', 
-                values=total_score_col, 
-                aggfunc='first'  # 假设每个班级每月只有一条记录
-            ).reset_index()
-            
-            # 对月份列进行排序
-            # 创建月份映射，用于排序
-            month_order = ['1月', '2月', '3月', '4月', '5月', '6月', '7月', '8月', '9月', '10月', '11月', '12月']
-            
-            # 获取当前的月份列，并按照month_order排序
-            current_months = list(pivot_df.columns[1:])  # 排除'班级'列
-            sorted_months = sorted(current_months, key=lambda x: month_order.index(x))
-            
-            # 重排透视表的列
-            pivot_df = pivot_df[['班级'] + sorted_months]
+            # 创建透视表，按班级和月份展示总分（月份按月份顺序排列）
+            score_matrix = analytics.class_month_matrix(combined_df, total_score_col)
+            pivot_df = score_matrix.reset_index()
             
             # 重命名列，格式为"月份总分"
             pivot_df.columns = ['班级'] + [f'{month}总分' for month in pivot_df.columns[1:]]
             
-            # 将索引重命名为"序号"
-            pivot_df.index = range(1, len(pivot_df) + 1)
-            pivot_df.index.name = "序号"
-            
             # 显示前10行数据
             display_pivot = pivot_df.head(10)
             
             # 使用HTML生成居中对齐的表格
-            html_table = f"""
-            <table style="width: 100%; border-collapse: collapse; text-align: center;">
-                <thead>
-                    <tr style="background-color: #f0f2f6;">
-                        <th style="padding: 8px; border: 1px solid #ddd;">序号</th>
-                        {''.join([f'<th style="padding: 8px; border: 1px solid #ddd;">{col}</th>' for col in display_pivot.columns])}
-                    </tr>
-                </thead>
-                <tbody>
-                    {''.join([
-                        '<tr>' + f'<td style="padding: 8px; border: 1px solid #ddd;">{index}</td>' + ''.join([f'<td style="padding: 8px; border: 1px solid #ddd;">{val}</td>' for val in row]) + '</tr>'
-                        for index, row in display_pivot.iterrows()
-                    ])}
-                </tbody>
-            </table>
-            """
-            st.markdown(html_table, unsafe_allow_html=True)
+            html_table.render_html_table(display_pivot)
         except Exception as e:
             st.error(f"创建横向预览时出错: {str(e)}")
             # 回退到基本预览
             st.markdown('<div class="subsection-header-with-icon">👀 基本数据预览</div>', unsafe_allow_html=True)
-            preview_df = combined_df.copy()
+            preview_df = combined_df
             
             # 只显示存在的列
             available_columns = ['班级', '月份']
@@ -146,63 +128,23 @@ def trend_analysis():
             
             # 过滤掉不存在的列
             final_columns = [col for col in available_columns if col in preview_df.columns]
-            display_df = preview_df[final_columns].head(10).copy()
-            
-            # 将索引重命名为"序号"
-            display_df.index = range(1, len(display_df) + 1)
-            display_df.index.name = "序号"
+            display_df = preview_df[final_columns].head(10)
             
             # 使用HTML生成居中对齐的表格
-            html_table = f"""
-            <table style="width: 100%; border-collapse: collapse; text-align: center;">
-                <thead>
-                    <tr style="background-color: #f0f2f6;">
-                        <th style="padding: 8px; border: 1px solid #ddd;">序号</th>
-                        {''.join([f'<th style="padding: 8px; border: 1px solid #ddd;">{col}</th>' for col in display_df.columns])}
-                    </tr>
-                </thead>
-                <tbody>
-                    {''.join([
-                        '<tr>' + f'<td style="padding: 8px; border: 1px solid #ddd;">{index}</td>' + ''.join([f'<td style="padding: 8px; border: 1px solid #ddd;">{val}</td>' for val in row]) + '</tr>'
-                        for index, row in display_df.iterrows()
-                    ])}
-                </tbody>
-            </table>
-            """
-            st.markdown(html_table, unsafe_allow_html=True)
+            html_table.render_html_table(display_df)
     else:
         # 没有找到总分列，显示基本预览
         st.markdown('<div class="subsection-header-with-icon">👀 基本数据预览</div>', unsafe_allow_html=True)
-        preview_df = combined_df.copy()
+        preview_df = combined_df
         
         # 只显示基本信息
         basic_columns = ['班级', '月份']
         # 过滤掉不存在的列
         final_columns = [col for col in basic_columns if col in preview_df.columns]
-        display_df = preview_df[final_columns].head(10).copy()
-        
-        # 将索引重命名为"序号"
-        display_df.index = range(1, len(display_df) + 1)
-        display_df.index.name = "序号"
+        display_df = preview_df[final_columns].head(10)
         
         # 使用HTML生成居中对齐的表格
-        html_table = f"""
-        <table style="width: 100%; border-collapse: collapse; text-align: center;">
-            <thead>
-                <tr style="background-color: #f0f2f6;">
-                    <th style="padding: 8px; border: 1px solid #ddd;">序号</th>
-                    {''.join([f'<th style="padding: 8px; border: 1px solid #ddd;">{col}</th>' for col in display_df.columns])}
-                </tr>
-            </thead>
-            <tbody>
-                {''.join([
-                    '<tr>' + f'<td style="padding: 8px; border: 1px solid #ddd;">{index}</td>' + ''.join([f'<td style="padding: 8px; border: 1px solid #ddd;">{val}</td>' for val in row]) + '</tr>'
-                    for index, row in display_df.iterrows()
-                ])}
-            </tbody>
-        </table>
-        """
-        st.markdown(html_table, unsafe_allow_html=True)
+        html_table.render_html_table(display_df)
     
     # 班级纵向对比
     st.markdown('<div class="subsection-header-with-icon">📈 班级纵向对比</div>', unsafe_allow_html=True)
@@ -217,41 +159,17 @@ def trend_analysis():
         available_classes = combined_df['班级'].unique()
         selected_class = st.selectbox("选择班级", available_classes)
         
-        # 筛选该班级的数据
-        class_data = combined_df[combined_df['班级'] == selected_class].copy()
-        
-        # 按月份排序
-        # 创建月份映射，用于排序
-        month_order = ['1月', '2月', '3月', '4月', '5月', '6月', '7月', '8月', '9月', '10月', '11月', '12月']
-        class_data['月份排序'] = class_data['月份'].map(lambda x: month_order.index(x))
-        class_data = class_data.sort_values('月份排序').drop('月份排序', axis=1)
+        # 筛选该班级的数据，并按月份排序（月份列为按月份顺序排列的有序分类）
+        class_data = combined_df[combined_df['班级'] == selected_class].sort_values('月份')
         
         # 显示班级数据表格
         st.markdown(f'<div class="subsection-header-with-icon">📊 {selected_class} 各月份数据</div>', unsafe_allow_html=True)
         display_class_df = class_data[['月份', '实际班级总分'] + [col for col in combined_df.columns if col not in ['月份', '班级', '实际班级总分'] and '班级' not in col]].copy()
-        # 将空值填充为0
-        display_class_df = display_class_df.fillna(0)
-        display_class_df.index = range(1, len(display_class_df) + 1)
-        display_class_df.index.name = "序号"
+        # 将数值列的空值填充为0
+        display_class_df = display_class_df.fillna({col: 0 for col in display_class_df.columns if col != '月份'})
         
         # 使用HTML生成居中对齐的表格
-        html_table = f"""
-        <table style="width: 100%; border-collapse: collapse; text-align: center;">
-            <thead>
-                <tr style="background-color: #f0f2f6;">
-                    <th style="padding: 8px; border: 1px solid #ddd;">序号</th>
-                    {''.join([f'<th style="padding: 8px; border: 1px solid #ddd;">{col}</th>' for col in display_class_df.columns])}
-                </tr>
-            </thead>
-            <tbody>
-                {''.join([
-                    '<tr>' + f'<td style="padding: 8px; border: 1px solid #ddd;">{index}</td>' + ''.join([f'<td style="padding: 8px; border: 1px solid #ddd;">{val}</td>' for val in row]) + '</tr>'
-                    for index, row in display_class_df.iterrows()
-                ])}
-            </tbody>
-        </table>
-        """
-        st.markdown(html_table, unsafe_allow_html=True)
+        html_table.render_html_table(display_class_df)
         
         # 创建班级总分趋势图
         st.markdown('<div class="subsection-header-with-icon">📈 班级总分趋势</div>', unsafe_allow_html=True)
@@ -282,13 +200,6 @@ def trend_analysis():
     # 班级扣分风险预测
     st.markdown('<div class="subsection-header-with-icon">⚠️ 班级扣分风险预测</div>', unsafe_allow_html=True)
     
-    # 查找总分列（支持不同名称）
-    total_score_col = None
-    for col in combined_df.columns:
-        if '实际班级总分' in col or '总分' in col:
-            total_score_col = col
-            break
-    
     # 检查必要的列是否存在
     if '班级' not in combined_df.columns:
         st.error("数据中没有找到'班级'列，无法进行风险预测")
@@ -298,87 +209,26 @@ def trend_analysis():
         st.error("数据中没有找到'月份'列，无法进行风险预测")
     else:
         try:
-            # 导入numpy用于计算
-            import numpy as np
+            if score_matrix is None:
+                score_matrix = analytics.class_month_matrix(combined_df, total_score_col)
             
-            # 计算每个班级的总分变化趋势
-            risk_classes = []
-            all_classes = combined_df['班级'].unique()
+            # 计算所有班级的趋势斜率（按月份间隔的最小二乘）、首末月份总分变化和有效月份数，缺失月份不参与计算：
+            # 选择了全部月份且不填充缺失月份时直接使用导入时增量维护的统计量，否则对所选月份的矩阵一次性计算
+            trends = analytics.trend_slopes(score_matrix, total_score_col, months=loaded_months if fill_strategy == NO_FILL else None)
             
-            for cls in all_classes:
-                # 获取该班级的数据
-                class_data = combined_df[combined_df['班级'] == cls].copy()
-                
-                # 确保有足够的数据点（至少2个月份）
-                if len(class_data) < 2:
-                    continue
-                
-                # 按月份排序
-                month_order = ['1月', '2月', '3月', '4月', '5月', '6月', '7月', '8月', '9月', '10月', '11月', '12月']
-                try:
-                    class_data['月份排序'] = class_data['月份'].map(lambda x: month_order.index(x))
-                    class_data = class_data.sort_values('月份排序').drop('月份排序', axis=1)
-                except ValueError:
-                    # 如果月份不在month_order中，跳过该班级
-                    continue
-                
-                # 使用简单的线性回归计算趋势斜率
-                # 月份转换为数值索引（0, 1, 2, ...）
-                x = np.array(range(len(class_data)))
-                y = np.array(class_data[total_score_col].fillna(0))  # 填充空值以确保计算正确
-                
-                # 计算斜率
-                try:
-                    slope = np.polyfit(x, y, 1)[0]
-                except np.linalg.LinAlgError:
-                    # 如果无法计算斜率，跳过该班级
-                    continue
-                
-                # 如果斜率为负，说明总分呈下降趋势，存在扣分风险
-                if slope < 0:
-                    # 计算下降幅度（最后一个月与第一个月的差值）
-                    score_diff = y[-1] - y[0]
-                    
-                    risk_classes.append({
-                        '班级': cls,
-                        '趋势斜率': slope,
-                        '总分变化': score_diff,
-                        '数据月份数': len(class_data),
-                        '最近月份': class_data['月份'].iloc[-1]
-                    })
+            # 斜率为负说明总分呈下降趋势，存在扣分风险（至少需要2个月份的数据），按总分下降幅度从大到小排序
+            risk_df = analytics.risk_classes(trends)
             
-            if risk_classes:
-                # 转换为DataFrame并排序（按总分下降幅度从大到小）
-                risk_df = pd.DataFrame(risk_classes)
-                risk_df = risk_df.sort_values('总分变化', ascending=True)
-                
+            if not risk_df.empty:
                 # 显示风险班级表格
                 display_risk_df = risk_df.copy()
-                display_risk_df.index = range(1, len(display_risk_df) + 1)
-                display_risk_df.index.name = "序号"
                 
                 # 格式化显示
                 display_risk_df['趋势斜率'] = display_risk_df['趋势斜率'].round(2)
                 display_risk_df['总分变化'] = display_risk_df['总分变化'].round(2)
                 
-                # 使用HTML生成居中对齐的表格
-                html_table = f"""
-                <table style="width: 100%; border-collapse: collapse; text-align: center;">
-                    <thead>
-                        <tr style="background-color: #f0f2f6;">
-                            <th style="padding: 8px; border: 1px solid #ddd;">序号</th>
-                            {''.join([f'<th style="padding: 8px; border: 1px solid #ddd;">{col}</th>' for col in display_risk_df.columns])}
-                        </tr>
-                    </thead>
-                    <tbody>
-                        {''.join([
-                            '<tr>' + f'<td style="padding: 8px; border: 1px solid #ddd;">{index}</td>' + ''.join([f'<td style="padding: 8px; border: 1px solid #ddd;">{val}</td>' for val in row]) + '</tr>'
-                            for index, row in display_risk_df.iterrows()
-                        ])}
-                    </tbody>
-                </table>
-                """
-                st.markdown(html_table, unsafe_allow_html=True)
+                # 使用HTML生成居中对齐的表格（风险班级较多时分页显示）
+                html_table.render_html_table(display_risk_df, page_size=html_table.DEFAULT_PAGE_SIZE, key="risk_table")
                 
                 # 可视化风险班级
                 st.markdown('<div class="subsubsection-header">📉 风险班级总分变化趋势</div>', unsafe_allow_html=True)
@@ -386,21 +236,14 @@ def trend_analysis():
                 # 创建图表
                 fig_risk = go.Figure()
                 
-                # 添加风险班级的趋势线
-                for cls in risk_df['班级']:
-                    class_data = combined_df[combined_df['班级'] == cls].copy()
-                    month_order = ['1月', '2月', '3月', '4月', '5月', '6月', '7月', '8月', '9月', '10月', '11月', '12月']
-                    class_data['月份排序'] = class_data['月份'].map(lambda x: month_order.index(x))
-                    class_data = class_data.sort_values('月份排序')
-                    
-                    # 为可视化准备数据（填充空值）
-                    vis_data = class_data.copy()
-                    vis_data[total_score_col] = vis_data[total_score_col].fillna(0)
-                    
+                # 添加风险班级的趋势线（直接取矩阵中对应的行，缺失的月份跳过）
+                risk_matrix = score_matrix.loc[risk_df['班级']]
+                for cls, row in zip(risk_matrix.index, risk_matrix.to_numpy()):
                     fig_risk.add_trace(go.Scatter(
-                        x=vis_data['月份'],
-                        y=vis_data[total_score_col],
+                        x=risk_matrix.columns,
+                        y=row,
                         mode='lines+markers',
+                        connectgaps=True,
                         name=cls
                     ))
                 
@@ -419,7 +262,48 @@ def trend_analysis():
                 st.warning("⚠️ 以上班级的总分呈下降趋势，建议重点关注并采取改进措施！")
             else:
                 st.success("✅ 所有班级的总分趋势均为上升或稳定，未发现明显扣分风险。")
-        
+            
+            # 下月总分预测（所有班级同时拟合多个模型，按回测误差为每个班级选择模型）
+            st.markdown('<div class="subsubsection-header">🔮 下月总分预测</div>', unsafe_allow_html=True)
+            forecast_df = forecasting.forecast_next(score_matrix)
+            forecast_df = forecast_df.sort_values('下月预测', ascending=True).reset_index()
+            for col in ['下月预测', '预测下限', '预测上限', '回测平均误差']:
+                forecast_df[col] = forecast_df[col].round(2)
+            
+            # 使用HTML生成居中对齐的表格（按预测总分从低到高排列，班级较多时分页显示）
+            html_table.render_html_table(forecast_df, page_size=html_table.DEFAULT_PAGE_SIZE, key="forecast_table")
+            st.caption("每个班级分别用最近值、线性趋势、Theil-Sen稳健趋势和阻尼Holt平滑模型预测，"
+                       "按滚动回测（依次用前几个月预测下一个月）的平均误差选择误差最小的模型；"
+                       "预测区间约为80%区间，历史月份太少无法回测的班级使用最近值且不给出区间，只回测过一次的班级也不给出区间。")
+
+            # 下月跌入后5名的概率（对历史月度变化自助抽样，批量模拟下个月的总分）
+            st.markdown('<div class="subsubsection-header">🎲 下月跌入后5名概率</div>', unsafe_allow_html=True)
+            # 默认阈值为各班级最近一个月总分的平均分
+            current_scores = score_matrix.ffill(axis=1).iloc[:, -1] if score_matrix.shape[1] else pd.Series(dtype='float64')
+            default_threshold = float(current_scores.mean()) if current_scores.notna().any() else 0.0
+            with st.expander("⚙️ 模拟设置", expanded=False):
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    draws = st.number_input("模拟次数", min_value=1000, max_value=200000, value=risk_simulation.DEFAULT_DRAWS, step=1000, key="risk_sim_draws")
+                with col2:
+                    threshold = st.number_input("总分阈值", value=round(default_threshold, 1), step=1.0, key="risk_sim_threshold")
+                with col3:
+                    seed = st.number_input("随机种子", min_value=0, value=risk_simulation.DEFAULT_SEED, step=1, key="risk_sim_seed")
+
+            sim_df = risk_simulation.simulate_next_month(score_matrix, draws=int(draws), seed=int(seed), threshold=threshold)
+            bottom_col = f'跌入后{risk_simulation.DEFAULT_BOTTOM_N}名概率'
+            sim_df = sim_df.sort_values([bottom_col, '预期总分'], ascending=[False, True]).reset_index()
+            sim_df['当前总分'] = sim_df['当前总分'].round(2)
+            sim_df['预期总分'] = sim_df['预期总分'].round(2)
+            for col in [bottom_col, '低于阈值概率']:
+                sim_df[col] = (sim_df[col] * 100).round(1).astype(str) + '%'
+
+            # 使用HTML生成居中对齐的表格（按跌入后5名的概率从高到低排列，班级较多时分页显示）
+            html_table.render_html_table(sim_df, page_size=html_table.DEFAULT_PAGE_SIZE, key="risk_sim_table")
+            st.caption(f"对每个班级历史上相邻月份的总分变化有放回地抽样，模拟下个月的总分 {int(draws)} 次，"
+                       f"统计每个班级落在后{risk_simulation.DEFAULT_BOTTOM_N}名和低于阈值 {threshold:g} 分的比例；"
+                       "只有一个月数据的班级从所有班级的变化中抽样。固定随机种子时结果可复现。")
+
         except Exception as e:
             st.error(f"进行风险预测时出错: {str(e)}")
             import traceback
@@ -429,8 +313,7 @@ def trend_analysis():
     st.markdown('<div class="subsection-header-with-icon">📈 考核项目纵向对比</div>', unsafe_allow_html=True)
     
     # 确定考核项目列
-    required_columns = ['编号', '班级', '初始分数', '实际班级总分', '月份']
-    scoring_columns = [col for col in combined_df.columns if col not in required_columns]
+    scoring_columns = analytics.item_columns(combined_df.columns)
     
     if not scoring_columns:
         st.error("未找到考核项目列")
@@ -438,43 +321,14 @@ def trend_analysis():
         # 选择要对比的考核项目
         selected_project = st.selectbox("选择考核项目", scoring_columns)
         
-        # 按月份统计该项目的平均分
-        # 确保selected_project列是数值类型
-        combined_df[selected_project] = pd.to_numeric(combined_df[selected_project], errors='coerce')
-        # 执行聚合操作
-        monthly_stats = combined_df.groupby('月份')[selected_project].agg(['mean', 'sum', 'count']).reset_index()
-        monthly_stats.columns = ['月份', '平均分', '总分', '班级数']
-        
-        # 按月份排序
-        # 创建月份映射，用于排序
-        month_order = ['1月', '2月', '3月', '4月', '5月', '6月', '7月', '8月', '9月', '10月', '11月', '12月']
-        monthly_stats['月份排序'] = monthly_stats['月份'].map(lambda x: month_order.index(x))
-        monthly_stats = monthly_stats.sort_values('月份排序').drop('月份排序', axis=1)
+        # 从预先聚合的结果中读取该项目各月份的平均分、总分和班级数（切换项目只需查询，不再重新分组统计）
+        monthly_stats = analytics.item_trend(selected_project, loaded_months)
         
         # 显示统计数据表格
         st.markdown(f'<div class="subsection-header-with-icon">📊 {selected_project} 各月份统计</div>', unsafe_allow_html=True)
-        display_stats_df = monthly_stats.copy()
-        display_stats_df.index = range(1, len(display_stats_df) + 1)
-        display_stats_df.index.name = "序号"
         
         # 使用HTML生成居中对齐的表格
-        html_table = f"""
-        <table style="width: 100%; border-collapse: collapse; text-align: center;">
-            <thead>
-                <tr style="background-color: #f0f2f6;">
-                    <th style="padding: 8px; border: 1px solid #ddd;">序号</th>
-                    {''.join([f'<th style="padding: 8px; border: 1px solid #ddd;">{col}</th>' for col in display_stats_df.columns])}
-                </tr>
-            </thead>
-            <tbody>
-                {''.join([
-                    '<tr>' + f'<td style="padding: 8px; border: 1px solid #ddd;">{index}</td>' + ''.join([f'<td style="padding: 8px; border: 1px solid #ddd;">{val}</td>' for val in row]) + '</tr>'
-                    for index, row in display_stats_df.iterrows()
-                ])}
-            </tbody>
-        </table>
-        """
-        st.markdown(html_table, unsafe_allow_html=True)
+        html_table.render_html_table(monthly_stats)
         
         # 创建考核项目趋势图
         st.markdown('<div class="subsection-header-with-icon">📈 考核项目趋势</div>', unsafe_allow_html=True)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import data_catalog
+
+# 透视为班级×月份矩阵
+def class_month_matrix(df, value_col, class_col='班级', month_col='月份'):
+    """把长表透视为班级×月份的数值矩阵（月份按月份顺序排列），缺失的月份为NaN
+
+    同一班级一个月有多条记录时（校验时会标出）取平均值，与数据库中增量维护的趋势统计量一致。
+    """
+    matrix = df.pivot_table(
+        index=class_col,
+        columns=month_col,
+        values=value_col,
+        aggfunc='mean',
+        observed=True
+    )
+    months = sorted((str(month) for month in matrix.columns), key=lambda month: (data_catalog.month_key(month), month))
+    matrix.columns = [str(month) for month in matrix.columns]
+    matrix = matrix[months].astype('float64')
+    matrix.columns.name = month_col
+    return matrix
+
+# 由回归充分统计量计算斜率
+def slopes_from_sums(n, sum_x, sum_y, sum_xy, sum_xx):
+    """按n、Σx、Σy、Σxy、Σx²向量化计算最小二乘斜率，少于2个点或x全部相同时为NaN"""
+    n = np.asarray(n, dtype='float64')
+    sum_x = np.asarray(sum_x, dtype='float64')
+    denom = n * np.asarray(sum_xx, dtype='float64') - sum_x * sum_x
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where((n >= 2) & (denom > 1e-9), (n * np.asarray(sum_xy, dtype='float64') - sum_x * np.asarray(sum_y, dtype='float64')) / denom, np.nan)
+
+# 批量计算所有班级的趋势
+def trend_stats(matrix, x=None):
+    """对班级×月份矩阵的每一行一次性计算最小二乘趋势斜率、首末月份差值、有效月份数和最近月份
+
+    x为各月份的横坐标，默认使用月份序号（月份之间有间隔时斜率按实际间隔计算）。
+    缺失值不参与计算（不按0处理）；有效月份少于2个的班级斜率为NaN。
+    """
+    columns = ['趋势斜率', '总分变化', '数据月份数', '最近月份']
+    if matrix.shape[1] == 0:
+        return pd.DataFrame(columns=columns, index=matrix.index)
+    values = matrix.to_numpy(dtype='float64')
+    if x is None:
+        x = np.array([data_catalog.month_key(month) for month in matrix.columns], dtype='float64')
+    valid = ~np.isnan(values)
+    n = valid.sum(axis=1)
+
+    # 闭式最小二乘：slope = (nΣxy - ΣxΣy) / (nΣx² - (Σx)²)，只累加有效值
+    xs = np.where(valid, x, 0.0)
+    ys = np.where(valid, values, 0.0)
+    slope = slopes_from_sums(n, xs.sum(axis=1), ys.sum(axis=1), (xs * ys).sum(axis=1), (xs * xs).sum(axis=1))
+
+    # 第一个和最后一个有效月份
+    rows = np.arange(len(values))
+    first = valid.argmax(axis=1)
+    last = values.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+    has_data = n > 0
+    delta = np.where(has_data, values[rows, last] - values[rows, first], np.nan)
+    months = np.asarray(matrix.columns, dtype=object)
+
+    return pd.DataFrame({
+        '趋势斜率': slope,
+        '总分变化': delta,
+        '数据月份数': n,
+        '最近月份': np.where(has_data, months[last], None)
+    }, index=matrix.index, columns=columns)
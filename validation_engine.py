@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+import deduction_analysis
+
+# 数据校验规则配置文件
+RULES_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'validation_rules.json')
+
+# 规则中表示“所有考核项目列”的列名
+ITEMS_SELECTOR = '@items'
+
+# 校验结果的列
+VIOLATION_COLUMNS = ['月份', '行号', '班级', '规则', '列', '值', '期望值', '说明']
+
+# 已编译的规则（进程内共享）：配置文件路径 -> {'mtime_ns': 修改时间, 'rules': 编译结果}
+_rules_cache = {}
+_rules_lock = threading.Lock()
+
+# 按列名或选择符取得要检查的列
+def _resolve_columns(df, column):
+    if column == ITEMS_SELECTOR:
+        return deduction_analysis.scoring_columns(df)
+    return [column] if column in df.columns else []
+
+# 把若干列转换为数值矩阵（无法转换的文本为NaN）
+def _numeric_matrix(df, columns):
+    if not columns:
+        return np.empty((len(df), 0))
+    return np.column_stack([
+        pd.to_numeric(df[col].astype(object) if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col], errors='coerce')
+        .to_numpy(dtype='float64', na_value=np.nan)
+        for col in columns
+    ])
+
+# 没有违规的检查结果
+def _no_violations():
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=object), np.empty(0), np.empty(0)
+
+# 编译总分规则：column = base + sum(terms)
+def _compile_sum(rule):
+    column, base, terms, tolerance = rule['column'], rule['base'], rule.get('terms', ITEMS_SELECTOR), float(rule.get('tolerance', 0))
+
+    def check(df, keys):
+        if column not in df.columns or base not in df.columns:
+            return _no_violations()
+        total, start = _numeric_matrix(df, [column, base]).T
+        expected = start + np.nansum(_numeric_matrix(df, _resolve_columns(df, terms)), axis=1)
+        with np.errstate(invalid='ignore'):
+            rows = np.flatnonzero(np.abs(total - expected) > tolerance)
+        return rows, np.full(len(rows), column, dtype=object), total[rows], expected[rows]
+    return check
+
+# 编译非空规则
+def _compile_not_null(rule):
+    column = rule['column']
+
+    def check(df, keys):
+        if column not in df.columns:
+            return _no_violations()
+        rows = np.flatnonzero(df[column].isna().to_numpy())
+        return rows, np.full(len(rows), column, dtype=object), np.full(len(rows), np.nan), np.full(len(rows), np.nan)
+    return check
+
+# 编译唯一性规则（在同一月份内检查）
+def _compile_unique(rule):
+    column = rule['column']
+
+    def check(df, keys):
+        if column not in df.columns:
+            return _no_violations()
+        duplicated = df.duplicated(subset=keys + [column], keep=False) & df[column].notna()
+        rows = np.flatnonzero(duplicated.to_numpy())
+        return rows, np.full(len(rows), column, dtype=object), np.full(len(rows), np.nan), np.full(len(rows), np.nan)
+    return check
+
+# 编译取值范围规则
+def _compile_range(rule):
+    column = rule['column']
+    low = float(rule['min']) if rule.get('min') is not None else -np.inf
+    high = float(rule['max']) if rule.get('max') is not None else np.inf
+
+    def check(df, keys):
+        columns = _resolve_columns(df, column)
+        values = _numeric_matrix(df, columns)
+        rows, cols = np.nonzero((values < low) | (values > high))
+        return rows, np.asarray(columns, dtype=object)[cols], values[rows, cols], np.full(len(rows), np.nan)
+    return check
+
+# 规则类型 -> 编译函数(规则) -> 检查函数(数据, 月份列) -> (行位置, 列名, 值, 期望值)
+RULE_KINDS = {
+    'sum': _compile_sum,
+    'not_null': _compile_not_null,
+    'unique': _compile_unique,
+    'range': _compile_range
+}
+
+# 编译规则
+def compile_rules(config):
+    """把规则配置编译为检查函数列表，每条规则只编译一次；规则类型不支持时抛出ValueError"""
+    compiled = []
+    for rule in config.get('rules', []):
+        kind = rule.get('kind')
+        if kind not in RULE_KINDS:
+            raise ValueError(f"不支持的校验规则类型: {kind}")
+        compiled.append({'id': rule['id'], 'message': rule.get('message', rule['id']), 'check': RULE_KINDS[kind](rule)})
+    return compiled
+
+# 读取并编译数据校验规则
+def load_rules(path=RULES_PATH):
+    """读取并编译数据校验规则，配置文件修改后自动重新编译
+
+    返回字典：checks为编译后的规则（按配置顺序），version为规则配置的内容哈希（规则变化后需要重新校验已导入的数据）。
+    """
+    path = os.path.abspath(path)
+    mtime_ns = os.stat(path).st_mtime_ns
+    with _rules_lock:
+        cached = _rules_cache.get(path)
+        if cached is not None and cached['mtime_ns'] == mtime_ns:
+            return cached['rules']
+    with open(path, 'rb') as f:
+        content = f.read()
+    rules = {
+        'checks': compile_rules(json.loads(content.decode('utf-8'))),
+        'version': hashlib.sha256(content).hexdigest()
+    }
+    with _rules_lock:
+        _rules_cache[path] = {'mtime_ns': mtime_ns, 'rules': rules}
+    return rules
+
+# 校验数据
+def validate(df, month=None, month_col='月份', rules=None):
+    """对df一次性应用所有校验规则，返回违规记录（列为VIOLATION_COLUMNS，按行号和规则顺序排列）
+
+    df为一个月份的宽表（month为该月份），也可以是包含月份列的多个月份的数据（唯一性在每个月份内检查）。
+    行号为违规行在df中的位置，列为违规的列，值为该列的值，期望值为总分规则计算出的总分。
+    """
+    rules = load_rules() if rules is None else rules
+    df = df.loc[:, ~df.columns.astype(str).str.startswith('Unnamed:')]
+    keys = [month_col] if month is None and month_col in df.columns else []
+    parts = [(index, check['check'](df, keys)) for index, check in enumerate(rules['checks'])]
+    if not parts:
+        return pd.DataFrame(columns=VIOLATION_COLUMNS)
+    rows = np.concatenate([part[0] for _, part in parts])
+    rule_order = np.concatenate([np.full(len(part[0]), index) for index, part in parts])
+    order = np.lexsort((rule_order, rows))
+    rows = rows[order]
+    rule_index = rule_order[order]
+
+    if keys:
+        months = df[month_col].astype(object).to_numpy()[rows]
+    else:
+        months = np.full(len(rows), month, dtype=object)
+    classes = df['班级'].astype(object).to_numpy()[rows] if '班级' in df.columns else np.full(len(rows), None, dtype=object)
+    return pd.DataFrame({
+        '月份': months,
+        '行号': rows,
+        '班级': np.where(pd.isna(classes), None, classes),
+        '规则': np.asarray([check['id'] for check in rules['checks']], dtype=object)[rule_index],
+        '列': np.concatenate([part[1] for _, part in parts])[order],
+        '值': np.concatenate([part[2] for _, part in parts])[order],
+        '期望值': np.concatenate([part[3] for _, part in parts])[order],
+        '说明': np.asarray([check['message'] for check in rules['checks']], dtype=object)[rule_index]
+    }, columns=VIOLATION_COLUMNS)